@@ -0,0 +1,158 @@
+"""
+Headless batch downloader: no Qt, newline-delimited JSON progress on stdout.
+
+    python batch.py urls.txt --format 720p --outdir ~/Videos --concurrency 4
+    cat urls.txt | python batch.py - --engine http
+    python batch.py images.txt --engine http-async
+    echo "https://example.com/file.iso sha256:9f86d0..." | python batch.py - --engine http
+    python batch.py urls.txt --stats stats.csv
+
+Each stdout line is one JSON event: "status", "progress", "finished" per URL,
+then a final "summary". Anything the download engines print goes to stderr.
+A URL may be followed by its expected hash ("sha256:<hex>" or "blake2b:<hex>");
+a file that does not match fails. "finished" events carry the file's digest
+when it was hashed: with an expected hash, or for every file with --hash.
+With --stats, per-task timings are written at the end (CSV or JSON by extension).
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from core.bandwidth import get_limiter
+from core.job import DownloadJob
+from core.postprocess import get_postprocess_pool
+from core.scheduler import DownloadScheduler
+from core.stats import get_stats
+from core.types import DownloadTypes
+
+FORMATS = ['Best Quality (Video + Audio)', '1080p', '720p', '480p', '360p', 'Audio (mp3)', 'Audio (m4a)']
+ENGINES = {'yt-dlp': DownloadTypes.YTDLP, 'http': DownloadTypes.HTTP, 'http-async': DownloadTypes.HTTP_ASYNC}
+# http-async transfers share one event loop and its per-host connection
+# limits, so far more of them may be in flight than thread-backed jobs
+ASYNC_CONCURRENCY = 128
+
+
+class EventWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event, url=None, **fields):
+        record = {'event': event, 'time': round(time.time(), 3)}
+        if url is not None:
+            record['url'] = url
+        record.update(fields)
+        line = json.dumps(record)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+def read_urls(source):
+    """
+    (url, expected hash or None) per non-empty, non-comment line.
+    """
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        lines = [line.split() for line in stream if line.strip() and not line.lstrip().startswith('#')]
+        return [(fields[0], fields[1] if len(fields) > 1 else None) for fields in lines]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def write_stats(path):
+    if not path:
+        return
+    try:
+        get_stats().export(path)
+    except OSError as e:
+        print(f"Could not write stats to {path}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Download a list of URLs without the GUI.')
+    parser.add_argument('urls', nargs='?', default='-', help="file with one URL per line, or '-' for stdin")
+    parser.add_argument('--format', default=FORMATS[0], choices=FORMATS)
+    parser.add_argument('--outdir', default='.')
+    parser.add_argument('--concurrency', type=int, help=f'default 3, {ASYNC_CONCURRENCY} with --engine http-async')
+    parser.add_argument('--per-host', type=int, help='default 2, unlimited with --engine http-async')
+    parser.add_argument('--engine', default='yt-dlp', choices=sorted(ENGINES))
+    parser.add_argument('--force', action='store_true', help='download items already in the download history')
+    parser.add_argument('--limit', type=int, default=0, help='total bandwidth cap in KiB/s (0 = unlimited)')
+    parser.add_argument('--postprocess-workers', type=int, default=0,
+                        help='ffmpeg merges / audio extractions at once (0 = one per core)')
+    parser.add_argument('--hash', action='store_true', help='hash every download (sha256), not only verified ones')
+    parser.add_argument('--stats', help='write per-task timings to this .json or .csv file at the end')
+    args = parser.parse_args(argv)
+
+    events = EventWriter(sys.stdout)
+    # Engines print() diagnostics; keep stdout for events only
+    sys.stdout = sys.stderr
+
+    urls = read_urls(args.urls)
+    get_limiter().configure(limit=args.limit * 1024)
+    get_postprocess_pool().set_workers(args.postprocess_workers)
+    results = {}
+    results_lock = threading.Lock()
+    asynchronous = ENGINES[args.engine] == DownloadTypes.HTTP_ASYNC
+    concurrency = args.concurrency or (ASYNC_CONCURRENCY if asynchronous else 3)
+    per_host = args.per_host or (concurrency if asynchronous else 2)
+    scheduler = DownloadScheduler(max_concurrent=concurrency, per_host=per_host)
+    jobs = []
+
+    # Keyed by input line: the same URL may be listed more than once
+    for index, (url, expected_hash) in enumerate(urls):
+        def report(progress=None, status=None, url=url):
+            if progress is not None:
+                events.emit('progress', url, progress=round(progress, 1))
+            if status is not None:
+                events.emit('status', url, status=status)
+
+        def finished(success, message, digest, url=url, index=index):
+            with results_lock:
+                results[index] = success
+            events.emit('finished', url, success=success, message=message, digest=digest or None)
+
+        try:
+            job = DownloadJob(url, args.outdir, args.format, ENGINES[args.engine], report=report, finished=finished,
+                              skip_existing=not args.force, expected_hash=expected_hash,
+                              hash_downloads=args.hash)
+        except ValueError as e:
+            finished(False, str(e), None)
+            continue
+        if not args.force:
+            record = job.already_downloaded()
+            if record and not expected_hash:
+                # Known from the history: never queued, no network
+                with results_lock:
+                    results[index] = True
+                events.emit('finished', url, success=True, message=record['path'], skipped=True,
+                            digest=f"sha256:{record['sha256']}" if record['sha256'] else None)
+                continue
+        jobs.append((job, scheduler.submit(job, url)))
+
+    try:
+        scheduler.wait()
+    except KeyboardInterrupt:
+        scheduler.pause()
+        # Pausing keeps partial files, so rerunning the same list resumes
+        for job, handle in jobs:
+            if not scheduler.cancel(handle):
+                job.pause()
+        scheduler.wait(timeout=5)
+        write_stats(args.stats)
+        events.emit('summary', ok=sum(results.values()), failed=len(results) - sum(results.values()),
+                    interrupted=True)
+        return 130
+
+    write_stats(args.stats)
+    ok = sum(1 for success in results.values() if success)
+    failed = len(results) - ok
+    events.emit('summary', ok=ok, failed=failed)
+    return 0 if not failed and len(results) == len(urls) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Local media site that yt-dlp's generic extractor can handle, for offline
+end-to-end download benchmarks.
+
+build_media() renders a test clip with ffmpeg into a DASH and an HLS tree
+(video renditions at several heights plus one AAC audio track, 2 s fMP4
+fragments) and writes a page per manifest with a <video> tag pointing at it:
+
+    /dash.html  -> dash/manifest.mpd
+    /hls.html   -> hls/master.m3u8
+
+    python benchmarks/fake_media_site.py --ffmpeg /usr/bin/ffmpeg --port 8000
+"""
+import argparse
+import functools
+import http.server
+import os
+import socketserver
+import subprocess
+import tempfile
+import threading
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><video controls><source src="{src}" type="{mime}"></video></body></html>
+"""
+
+HEIGHTS = (360, 720, 1080)
+
+
+def _encode_args(ffmpeg, duration, heights):
+    args = [ffmpeg, '-y', '-v', 'error',
+            '-f', 'lavfi', '-i', f'testsrc2=size=1920x1080:rate=30:duration={duration}',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=44100:duration={duration}']
+    for _ in heights:
+        args += ['-map', '0:v']
+    args += ['-map', '1:a', '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60', '-keyint_min', '60',
+             '-sc_threshold', '0', '-c:a', 'aac', '-b:a', '128k']
+    for i, height in enumerate(heights):
+        args += [f'-s:v:{i}', f'{height * 16 // 9}x{height}', f'-b:v:{i}', f'{height * 3}k']
+    return args
+
+
+def build_media(ffmpeg, root, duration=30, heights=HEIGHTS):
+    """
+    Renders the DASH and HLS trees and pages under `root`; returns `root`.
+    """
+    dash = os.path.join(root, 'dash')
+    hls = os.path.join(root, 'hls')
+    os.makedirs(dash, exist_ok=True)
+    os.makedirs(hls, exist_ok=True)
+
+    subprocess.run(_encode_args(ffmpeg, duration, heights) + [
+        '-f', 'dash', '-seg_duration', '2', '-use_template', '1', '-use_timeline', '0',
+        '-adaptation_sets', 'id=0,streams=v id=1,streams=a', 'manifest.mpd'
+    ], cwd=dash, check=True)
+
+    stream_map = ' '.join([f'v:{i},agroup:aud' for i in range(len(heights))] + ['a:0,agroup:aud,default:yes'])
+    subprocess.run(_encode_args(ffmpeg, duration, heights) + [
+        '-f', 'hls', '-hls_time', '2', '-hls_playlist_type', 'vod', '-hls_segment_type', 'fmp4',
+        '-var_stream_map', stream_map, '-master_pl_name', 'master.m3u8',
+        '-hls_segment_filename', 'seg_%v_%03d.m4s', '-hls_fmp4_init_filename', 'init_%v.mp4', 'stream_%v.m3u8'
+    ], cwd=hls, check=True)
+
+    with open(os.path.join(root, 'dash.html'), 'w') as f:
+        f.write(PAGE.format(title='DASH clip', src='dash/manifest.mpd', mime='application/dash+xml'))
+    with open(os.path.join(root, 'hls.html'), 'w') as f:
+        f.write(PAGE.format(title='HLS clip', src='hls/master.m3u8', mime='application/x-mpegURL'))
+    return root
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        '.mpd': 'application/dash+xml',
+        '.m3u8': 'application/x-mpegURL',
+        '.m4s': 'video/iso.segment',
+    }
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeMediaSite(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, root, host='127.0.0.1', port=0):
+        super().__init__((host, port), functools.partial(QuietHandler, directory=root))
+        self.root = root
+
+    def url(self, page):
+        return f'http://{self.server_address[0]}:{self.server_address[1]}/{page}'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local DASH/HLS test site.')
+    parser.add_argument('--ffmpeg', default='ffmpeg')
+    parser.add_argument('--duration', type=int, default=30)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix='yoo_site_') as root:
+        build_media(args.ffmpeg, root, args.duration)
+        site = FakeMediaSite(root, port=args.port)
+        print(f"Serving {site.url('dash.html')} and {site.url('hls.html')}")
+        try:
+            site.serve_forever()
+        except KeyboardInterrupt:
+            site.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Many small direct downloads: the threaded HTTP engine against the asyncio one.
+
+Each case downloads --files files of --size bytes from the local stand-in
+server through DownloadScheduler and DownloadJob, as batch.py does, in a
+fresh child process. Thread-backed jobs get one thread each, so their
+concurrency is the scheduler's; http-async jobs share one event loop and
+the per-host connection limit of the HTTP pool. With --rate every response
+is paced, which stands in for slow or far-away servers where a transfer
+spends most of its time waiting. Per case it reports files/s, MiB/s, CPU
+seconds, peak thread count, peak RSS and connections opened.
+
+    python benchmarks/http_many_files.py
+    python benchmarks/http_many_files.py --files 1000 --size 16K --cases http:16,http:128,http-async:128
+    python benchmarks/http_many_files.py --rate 256K --pool-size 64
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from standin_server import StandInServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+DEFAULT_CASES = 'http:8,http:32,http:128,http-async:128'
+
+CHILD = r'''
+import json, os, sys, threading, time
+sys.path.insert(0, ROOT)
+try:
+    import resource
+except ImportError:
+    resource = None
+from batch import ENGINES
+from core.http_pool import get_pool
+from core.job import DownloadJob
+from core.scheduler import DownloadScheduler
+
+case = json.loads(sys.argv[1])
+get_pool().configure(pool_maxsize=case['pool_size'])
+results = []
+peak_threads = [threading.active_count()]
+running = [True]
+
+def sample():
+    while running[0]:
+        peak_threads[0] = max(peak_threads[0], threading.active_count())
+        time.sleep(0.005)
+
+threading.Thread(target=sample, daemon=True).start()
+scheduler = DownloadScheduler(max_concurrent=case['concurrency'], per_host=case['concurrency'])
+cpu0 = time.process_time()
+wall0 = time.perf_counter()
+for url in case['urls']:
+    job = DownloadJob(url, case['outdir'], None, ENGINES[case['engine']], skip_existing=False,
+                      finished=lambda success, message, digest: results.append(success))
+    scheduler.submit(job, url)
+scheduler.wait()
+wall = time.perf_counter() - wall0
+cpu = time.process_time() - cpu0
+running[0] = False
+rss = None
+if resource is not None:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss if sys.platform == 'darwin' else rss * 1024
+size = sum(entry.stat().st_size for entry in os.scandir(case['outdir']) if entry.is_file())
+print('RESULT ' + json.dumps({'seconds': wall, 'cpu_seconds': cpu, 'ok': sum(results),
+                              'failed': len(results) - sum(results), 'bytes': size,
+                              'peak_threads': peak_threads[0], 'peak_rss_bytes': rss,
+                              'connections': get_pool().stats()}))
+'''
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def run_case(server, case, scratch):
+    outdir = os.path.join(scratch, 'out')
+    shutil.rmtree(outdir, ignore_errors=True)
+    os.makedirs(outdir)
+    options = {'rate': case['rate']} if case['rate'] else {}
+    child = {**case, 'outdir': outdir,
+             'urls': [server.url(case['size'], name=f'f{i:05d}.bin', **options) for i in range(case['files'])]}
+    env = dict(os.environ, LOCALAPPDATA=os.path.join(scratch, 'app'))
+    code = f'ROOT = {ROOT!r}\n' + CHILD
+    proc = subprocess.run([sys.executable, '-c', code, json.dumps(child)], capture_output=True, text=True,
+                          cwd=scratch, env=env)
+    line = next((line for line in proc.stdout.splitlines() if line.startswith('RESULT ')), None)
+    if line is None:
+        return {**case, 'error': (proc.stderr.strip().splitlines() or ['no result'])[-1]}
+    measured = json.loads(line[len('RESULT '):])
+    seconds = measured['seconds']
+    return {
+        **case,
+        **measured,
+        'error': None,
+        'files_per_second': round(measured['ok'] / seconds, 1) if seconds else None,
+        'mib_per_second': round(measured['bytes'] / 1024 ** 2 / seconds, 2) if seconds else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the HTTP engines on many small files.')
+    parser.add_argument('--files', type=int, default=500)
+    parser.add_argument('--size', default='64K', help='size of every file, e.g. 16K or 1M')
+    parser.add_argument('--cases', default=DEFAULT_CASES, help='comma-separated engine:concurrency pairs')
+    parser.add_argument('--rate', default='0', help='pace every response to this many bytes/s (0 = no pacing)')
+    parser.add_argument('--pool-size', type=int, default=8, help='keep-alive connections per host')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--output', help='JSON results path (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    cases = []
+    for item in args.cases.split(','):
+        engine, _, concurrency = item.partition(':')
+        cases.append({'engine': engine, 'concurrency': int(concurrency or 1), 'files': args.files,
+                      'size': parse_size(args.size), 'rate': parse_size(args.rate), 'pool_size': args.pool_size})
+
+    scratch = tempfile.mkdtemp(prefix='yoo_many_')
+    results = []
+    try:
+        with StandInServer() as server:
+            for case in cases:
+                for _ in range(args.runs):
+                    result = run_case(server, case, scratch)
+                    results.append(result)
+                    if result['error']:
+                        print(f"  {case['engine']:>10} x{case['concurrency']:<4} FAILED {result['error']}")
+                        continue
+                    print(f"  {case['engine']:>10} x{case['concurrency']:<4} {result['files_per_second']:8.1f} files/s"
+                          f"  {result['mib_per_second']:7.1f} MiB/s  cpu {result['cpu_seconds']:5.2f}s"
+                          f"  threads {result['peak_threads']:4d}"
+                          f"  rss {(result['peak_rss_bytes'] or 0) / 1024 ** 2:6.1f} MiB"
+                          f"  connections {result['connections']['new_connections']:4d}"
+                          f"  {result['failed']} failed")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'benchmark': 'http_many_files',
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"http_many_files-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+HttpDownloader throughput against the local stand-in server.
+
+Every case runs in a fresh child process, so peak RSS and CPU belong to that
+download alone; the server runs in this process. Per case it reports
+throughput, CPU seconds per GB, peak RSS, how often the progress callbacks
+ran and the share of wall time spent inside them. Results are written as
+JSON for tracking over time; --baseline compares against an earlier file.
+
+    python benchmarks/http_throughput.py
+    python benchmarks/http_throughput.py --size 256M --chunk-sizes 64K,1M --connections 1,8
+    python benchmarks/http_throughput.py --quick --baseline benchmarks/results/http_throughput-old.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from standin_server import StandInServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# name -> query options for the stand-in server
+SCENARIOS = {
+    'plain': {},
+    'throttled': {'rate': 'RATE'},
+    'norange': {'norange': 1},
+    'nolength': {'nolength': 1},
+    'drops': {'drop': 'DROP'},
+}
+
+CHILD = r'''
+import json, os, sys, time
+sys.path.insert(0, ROOT)
+try:
+    import resource
+except ImportError:
+    resource = None
+from core.downloader import HttpDownloader
+
+case = json.loads(sys.argv[1])
+calls = [0]
+inside = [0.0]
+
+def timed(callback):
+    def wrapper(value):
+        start = time.perf_counter()
+        callback(value)
+        inside[0] += time.perf_counter() - start
+        calls[0] += 1
+    return wrapper
+
+# What the GUI does per report: store the value and format the text
+last = {}
+progress = timed(lambda pct: last.__setitem__('pct', round(pct, 1)))
+status = timed(lambda text: last.__setitem__('status', str(text)))
+
+cpu0 = time.process_time()
+wall0 = time.perf_counter()
+attempts = 0
+error = None
+while attempts < case['max_attempts']:
+    attempts += 1
+    d = HttpDownloader(case['url'], filename=case['filename'], chunk_size=case['chunk_size'],
+                       connections=case['connections'], min_segment_size=case['min_segment_size'])
+    try:
+        d.download(progress_callback=progress, status_callback=status)
+        error = None
+        break
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+wall = time.perf_counter() - wall0
+cpu = time.process_time() - cpu0
+size = os.path.getsize(case['filename']) if os.path.exists(case['filename']) else 0
+rss = None
+if resource is not None:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss if sys.platform == 'darwin' else rss * 1024
+print('RESULT ' + json.dumps({'seconds': wall, 'cpu_seconds': cpu, 'bytes': size, 'attempts': attempts,
+                              'error': error, 'peak_rss_bytes': rss, 'callbacks': calls[0],
+                              'callback_seconds': inside[0]}))
+'''
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def run_case(server, case, outdir):
+    options = {key: case['rate'] if value == 'RATE' else case['drop'] if value == 'DROP' else value
+               for key, value in SCENARIOS[case['scenario']].items()}
+    filename = os.path.join(outdir, 'download.bin')
+    for leftover in (filename, filename + '.part', filename + '.part.json'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    child = {
+        'url': server.url(case['size'], **options),
+        'filename': filename,
+        'chunk_size': case['chunk_size'],
+        'connections': case['connections'],
+        'min_segment_size': case['min_segment_size'],
+        # A dropped connection fails the call; the next call resumes from the journal
+        'max_attempts': 1000 if case['scenario'] == 'drops' else 1,
+    }
+    code = f'ROOT = {ROOT!r}\n' + CHILD
+    proc = subprocess.run([sys.executable, '-c', code, json.dumps(child)], capture_output=True, text=True,
+                          cwd=outdir)
+    line = next((line for line in proc.stdout.splitlines() if line.startswith('RESULT ')), None)
+    if line is None:
+        return {**case, 'error': (proc.stderr.strip().splitlines() or ['no result'])[-1]}
+    measured = json.loads(line[len('RESULT '):])
+    if os.path.exists(filename):
+        os.remove(filename)
+    seconds = measured['seconds']
+    gigabytes = measured['bytes'] / 1024 ** 3
+    return {
+        **case,
+        **measured,
+        'complete': measured['bytes'] == case['size'] and not measured['error'],
+        'mib_per_second': round(measured['bytes'] / 1024 ** 2 / seconds, 2) if seconds else None,
+        'cpu_seconds_per_gb': round(measured['cpu_seconds'] / gigabytes, 3) if gigabytes else None,
+        'callback_share': round(measured['callback_seconds'] / seconds, 5) if seconds else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def case_key(result):
+    return (result['scenario'], result['size'], result['chunk_size'], result['connections'])
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r') as f:
+        baseline = {case_key(r): r for r in json.load(f)['results']}
+    print(f"change vs {os.path.basename(baseline_path)}:")
+    for result in results:
+        old = baseline.get(case_key(result))
+        if not old or not old.get('mib_per_second') or not result.get('mib_per_second'):
+            continue
+        change = (result['mib_per_second'] / old['mib_per_second'] - 1) * 100
+        print(f"  {result['scenario']:>9} chunk={result['chunk_size'] // 1024:>5}K conn={result['connections']}: "
+              f"{change:+6.1f}% throughput")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure HttpDownloader throughput on a local server.')
+    parser.add_argument('--size', default='128M', help='file size, e.g. 64M or 1G')
+    parser.add_argument('--chunk-sizes', default='64K,256K,1M')
+    parser.add_argument('--connections', default='1,4,8')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--rate', default='32M', help='per-response rate of the throttled scenario')
+    parser.add_argument('--drop', default='3M', help='bytes per response before the drops scenario cuts it')
+    parser.add_argument('--min-segment', default='4M', help="HttpDownloader's min_segment_size")
+    parser.add_argument('--quick', action='store_true', help='32M file, 256K chunks, 1 and 4 connections')
+    parser.add_argument('--output', help='JSON results path (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', help='earlier results file to compare throughput against')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.size, args.chunk_sizes, args.connections = '32M', '256K', '1,4'
+    size = parse_size(args.size)
+    chunk_sizes = [parse_size(c) for c in args.chunk_sizes.split(',')]
+    connections = [int(c) for c in args.connections.split(',')]
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f'unknown scenario {scenario!r}; choose from {", ".join(SCENARIOS)}')
+
+    cases = []
+    for scenario, chunk_size, count in itertools.product(scenarios, chunk_sizes, connections):
+        # Without ranges HttpDownloader always uses one connection; measure it once
+        if scenario in ('norange', 'nolength') and count != connections[0]:
+            continue
+        cases.append({'scenario': scenario, 'size': size, 'chunk_size': chunk_size, 'connections': count,
+                      'min_segment_size': parse_size(args.min_segment), 'rate': parse_size(args.rate),
+                      'drop': parse_size(args.drop)})
+
+    results = []
+    with StandInServer() as server, tempfile.TemporaryDirectory(prefix='yoo_bench_') as outdir:
+        for case in cases:
+            result = run_case(server, case, outdir)
+            results.append(result)
+            if result.get('error') and not result.get('complete'):
+                print(f"  {case['scenario']:>9} chunk={case['chunk_size'] // 1024:>5}K "
+                      f"conn={case['connections']}: FAILED {result['error']}")
+                continue
+            rss = result['peak_rss_bytes']
+            print(f"  {case['scenario']:>9} chunk={case['chunk_size'] // 1024:>5}K conn={case['connections']}: "
+                  f"{result['mib_per_second']:8.1f} MiB/s  {result['cpu_seconds_per_gb']:6.2f} CPU s/GB  "
+                  f"rss {rss / 1024 ** 2 if rss else 0:6.1f} MiB  {result['callbacks']:6d} callbacks "
+                  f"({result['callback_share'] * 100:.3f}% of wall)  attempts {result['attempts']}")
+
+    report = {
+        'benchmark': 'http_throughput',
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"http_throughput-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'results written to {output}')
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
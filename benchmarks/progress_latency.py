@@ -0,0 +1,148 @@
+"""
+UI event-loop latency while many workers report progress.
+
+Runs N fake download workers that report progress as fast as a fast link
+would (one report per 256 KiB chunk), either through per-chunk Qt signals
+(the old path) or through core.progress.ProgressTable drained at 10 Hz.
+A 5 ms probe timer on the UI thread measures how late the event loop is.
+
+    python benchmarks/progress_latency.py --workers 20 --seconds 5
+    QT_QPA_PLATFORM=offscreen python benchmarks/progress_latency.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QElapsedTimer, QTimer
+from PySide6.QtWidgets import QApplication, QLabel, QProgressBar, QVBoxLayout, QWidget
+
+from core.progress import ProgressTable
+from core.signals import DownloadWorkerSignals
+
+PROBE_MS = 5
+
+
+class Row(QWidget):
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        self.status = QLabel('Waiting')
+        self.progress = QProgressBar()
+        layout.addWidget(self.status)
+        layout.addWidget(self.progress)
+
+    def set_progress(self, pct):
+        self.progress.setValue(int(pct))
+
+    def set_status(self, text):
+        self.status.setText(str(text))
+
+
+def worker(stop, report, chunks_per_second):
+    total = 1024 * 1024 * 1024
+    downloaded = 0
+    delay = 1.0 / chunks_per_second
+    while not stop.is_set():
+        downloaded = (downloaded + 256 * 1024) % total
+        report(downloaded * 100 / total, f"{downloaded / 1024 / 1024:.1f} MB / {total / 1024 / 1024:.1f} MB")
+        time.sleep(delay)
+
+
+def run(mode, workers, seconds, chunks_per_second):
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    rows = [Row() for _ in range(workers)]
+    for row in rows:
+        layout.addWidget(row)
+    window.show()
+
+    stop = threading.Event()
+    table = ProgressTable()
+    reporters = []
+    drain = None
+    keep = []
+    for row in rows:
+        if mode == 'signals':
+            signals = DownloadWorkerSignals()
+            signals.progress.connect(row.set_progress)
+            signals.status.connect(row.set_status)
+            keep.append(signals)
+            reporters.append(lambda p, s, sig=signals: (sig.progress.emit(p), sig.status.emit(s)))
+        else:
+            reporters.append(lambda p, s, key=row: table.update(key, p, s))
+
+    if mode == 'table':
+        def apply():
+            for row, (pct, status) in table.snapshot().items():
+                row.set_progress(pct)
+                row.set_status(status)
+        drain = QTimer()
+        drain.setInterval(100)
+        drain.timeout.connect(apply)
+        drain.start()
+
+    lateness = []
+    clock = QElapsedTimer()
+    clock.start()
+    last = [clock.elapsed()]
+
+    def probe():
+        now = clock.elapsed()
+        lateness.append(max(0, now - last[0] - PROBE_MS))
+        last[0] = now
+
+    probe_timer = QTimer()
+    probe_timer.setInterval(PROBE_MS)
+    probe_timer.timeout.connect(probe)
+    probe_timer.start()
+
+    threads = [threading.Thread(target=worker, args=(stop, report, chunks_per_second), daemon=True)
+               for report in reporters]
+    for t in threads:
+        t.start()
+
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec()
+    stop.set()
+    for t in threads:
+        t.join()
+    probe_timer.stop()
+    if drain:
+        drain.stop()
+    app.processEvents()
+    window.close()
+
+    lateness.sort()
+    return {
+        'mode': mode,
+        'probes': len(lateness),
+        'mean_ms': round(statistics.fmean(lateness), 2) if lateness else None,
+        'p99_ms': lateness[int(len(lateness) * 0.99) - 1] if lateness else None,
+        'max_ms': lateness[-1] if lateness else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--chunks-per-second', type=int, default=400,
+                        help='reports per worker per second (400 x 256 KiB = 100 MiB/s)')
+    parser.add_argument('--mode', choices=['signals', 'table', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = ['signals', 'table'] if args.mode == 'both' else [args.mode]
+    for mode in modes:
+        result = run(mode, args.workers, args.seconds, args.chunks_per_second)
+        print(f"{result['mode']:>8}: {result['probes']} probes, event-loop lateness "
+              f"mean {result['mean_ms']} ms, p99 {result['p99_ms']} ms, max {result['max_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
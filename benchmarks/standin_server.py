@@ -0,0 +1,187 @@
+"""
+Local HTTP stand-in for download benchmarks.
+
+Serves generated files whose content is a function of the offset, so nothing
+is kept on disk and any byte range can be produced (and checked) cheaply.
+The path picks the size and the query string the misbehaviour:
+
+    /file/<bytes>                  plain file, Range and Content-Length
+    /file/<bytes>/<name>           the same, under a file name of its own
+    /file/<bytes>?rate=<B/s>       each response paced to about that rate
+    /file/<bytes>?norange=1        ignores Range, no Accept-Ranges
+    /file/<bytes>?nolength=1       no Content-Length (close-delimited, no ranges)
+    /file/<bytes>?drop=<bytes>     every response is cut after that many bytes
+
+    python benchmarks/standin_server.py --port 8000
+"""
+import argparse
+import hashlib
+import http.server
+import re
+import socketserver
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+BLOCK_SIZE = 1024 * 1024
+SEND_SIZE = 64 * 1024
+
+
+def _make_block():
+    # 1 MiB of pseudo-random bytes; file content is this block repeated
+    out = bytearray()
+    counter = 0
+    while len(out) < BLOCK_SIZE:
+        out += hashlib.sha256(counter.to_bytes(8, 'little')).digest()
+        counter += 1
+    return bytes(out[:BLOCK_SIZE])
+
+
+BLOCK = _make_block()
+# Twice the block, so any SEND_SIZE window starting inside the first copy is contiguous
+_DOUBLE = memoryview(BLOCK + BLOCK)
+
+
+def content(start, stop):
+    """
+    The bytes [start, stop) of every generated file.
+    """
+    out = bytearray()
+    position = start
+    while position < stop:
+        offset = position % BLOCK_SIZE
+        n = min(stop - position, BLOCK_SIZE)
+        out += _DOUBLE[offset:offset + n]
+        position += n
+    return bytes(out)
+
+
+def expected_sha256(size):
+    digest = hashlib.sha256()
+    for start in range(0, size, BLOCK_SIZE):
+        digest.update(content(start, min(size, start + BLOCK_SIZE)))
+    return digest.hexdigest()
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _parse(self):
+        parts = urlsplit(self.path)
+        match = re.fullmatch(r'/file/(\d+)(?:/.*)?', parts.path)
+        if not match:
+            return None
+        options = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        return int(match.group(1)), options
+
+    def _headers(self):
+        parsed = self._parse()
+        if parsed is None:
+            self.send_error(404)
+            return None
+        size, options = parsed
+        nolength = options.get('nolength') == '1'
+        ranges = options.get('norange') != '1' and not nolength
+        start, stop = 0, size
+        header = self.headers.get('Range')
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', header or '')
+        if ranges and match:
+            start = int(match.group(1))
+            stop = min(size, int(match.group(2)) + 1) if match.group(2) else size
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{stop - 1}/{size}')
+        else:
+            self.send_response(200)
+        if ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if nolength:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        else:
+            self.send_header('Content-Length', str(stop - start))
+        self.send_header('ETag', f'"{size}"')
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.end_headers()
+        return start, stop, options
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        parsed = self._headers()
+        if parsed is None:
+            return
+        start, stop, options = parsed
+        rate = float(options.get('rate', 0))
+        drop = int(options.get('drop', 0))
+        began = time.perf_counter()
+        sent = 0
+        position = start
+        try:
+            while position < stop:
+                offset = position % BLOCK_SIZE
+                n = min(SEND_SIZE, stop - position)
+                if drop and sent + n > drop:
+                    self.wfile.write(_DOUBLE[offset:offset + drop - sent])
+                    self.close_connection = True
+                    return
+                self.wfile.write(_DOUBLE[offset:offset + n])
+                position += n
+                sent += n
+                if rate:
+                    ahead = sent / rate - (time.perf_counter() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class StandInServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # Room for hundreds of clients connecting at once
+    request_queue_size = 512
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), StandInHandler)
+        self._thread = None
+
+    def url(self, size, name=None, **options):
+        query = '&'.join(f'{key}={value}' for key, value in options.items() if value)
+        path = f'/file/{size}' + (f'/{name}' if name else '')
+        return f'http://{self.server_address[0]}:{self.server_address[1]}{path}' + (f'?{query}' if query else '')
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve generated files for download benchmarks.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    server = StandInServer(args.host, args.port)
+    print(f'Serving on {server.url(BLOCK_SIZE)}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Startup benchmark: import time of the GUI modules and time to first window.
+
+Each run is a fresh interpreter, so numbers include Python startup. Time to
+first window is measured from process launch until the main window receives
+its first paint event.
+
+    python benchmarks/startup.py --runs 5
+    QT_QPA_PLATFORM=offscreen python benchmarks/startup.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should not be loaded before the first paint
+HEAVY_MODULES = ['yt_dlp', 'requests', 'PySide6.QtMultimedia']
+
+CHILD = r'''
+import sys, time, json
+sys.path.insert(0, ROOT)
+t0 = time.perf_counter()
+from PySide6.QtCore import QEvent, QObject, QTimer
+from PySide6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+t_qt = time.perf_counter()
+from ui.main_window import DownloaderWidget
+t_import = time.perf_counter()
+window = DownloaderWidget()
+t_init = time.perf_counter()
+result = {}
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and 'paint' not in result:
+            result['paint'] = time.perf_counter()
+            result['loaded'] = [m for m in HEAVY if m in sys.modules]
+            QTimer.singleShot(0, app.quit)
+        return False
+
+watcher = FirstPaint()
+window.installEventFilter(watcher)
+window.show()
+QTimer.singleShot(10000, app.quit)
+app.exec()
+print('RESULT ' + json.dumps({
+    'qt_ms': (t_qt - t0) * 1000,
+    'import_ms': (t_import - t_qt) * 1000,
+    'init_ms': (t_init - t_import) * 1000,
+    'paint_ms': (result.get('paint', time.perf_counter()) - t_init) * 1000,
+    'heavy_loaded_at_paint': result.get('loaded', []),
+}))
+sys.stdout.flush()
+import os
+os._exit(0)
+'''
+
+
+def run_once():
+    code = f"ROOT = {ROOT!r}\nHEAVY = {HEAVY_MODULES!r}\n" + CHILD
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            cwd=ROOT, text=True)
+    # The app prints its own diagnostics; the result line is tagged
+    line = ''
+    for line in proc.stdout:
+        if line.startswith('RESULT '):
+            break
+    wall = (time.perf_counter() - start) * 1000
+    proc.wait()
+    result = json.loads(line[len('RESULT '):])
+    result['first_window_ms'] = wall
+    return result
+
+
+def import_profile():
+    """
+    Top self-time modules from -X importtime for `import ui.main_window`.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ui.main_window'],
+                          cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    total = next((c for c, _, n in rows if n == 'ui.main_window'), None)
+    return total, sorted(rows, key=lambda r: r[1], reverse=True)[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import time and time to first window.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    total_us, top = import_profile()
+    summary = {key: round(statistics.median(r[key] for r in runs), 1)
+               for key in ('qt_ms', 'import_ms', 'init_ms', 'paint_ms', 'first_window_ms')}
+    summary['import_ui_main_window_ms'] = round(total_us / 1000, 1) if total_us else None
+    summary['heavy_loaded_at_paint'] = runs[-1]['heavy_loaded_at_paint']
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(f"median of {args.runs} runs")
+    for key, value in summary.items():
+        print(f"  {key:>26}: {value}")
+    print("slowest imports (self time):")
+    for cumulative_us, self_us, name in top:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+End-to-end YTDownloader benchmark on a local DASH/HLS site, fully offline.
+
+For every format preset of the app and every manifest type it runs the real
+path: yt-dlp's generic extractor, fragment download, DownloadJob's progress
+hook, the ffmpeg merge and audio post-processing. Per case it reports:
+
+    extract_s          extract_info(download=False) on its own
+    first_fragment_s   download() start until the first progress hook
+    fragment_mib_s     bytes of all downloaded files / time spent downloading them
+    fragments_per_s    fragments / time spent downloading them
+    postprocess_s      seconds per post-processor (Merger, ExtractAudio, ...)
+    hook_calls         DownloadJob._progress_hook calls and the share of the
+    hook_share         download phase spent inside them
+
+    python benchmarks/ytdl_e2e.py --ffmpeg /path/to/ffmpeg
+    python benchmarks/ytdl_e2e.py --manifests dash --presets 720p,"Audio (m4a)" --runs 3
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_media_site import FakeMediaSite, build_media
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+MANIFESTS = {'dash': 'dash.html', 'hls': 'hls.html'}
+
+
+class Probe:
+    """
+    Wraps DownloadJob's progress hook and collects timings from it and from
+    the post-processor hooks.
+    """
+
+    def __init__(self, hook):
+        self.hook = hook
+        self.started = None
+        self.first_hook = None
+        self.hook_calls = 0
+        self.hook_seconds = 0.0
+        self.files = {}
+        self.postprocess = {}
+        self._pp_started = {}
+
+    def progress(self, d):
+        now = time.perf_counter()
+        if self.first_hook is None:
+            self.first_hook = now
+        key = d.get('tmpfilename') or d.get('filename')
+        entry = self.files.setdefault(key, {'start': now, 'end': now, 'bytes': 0, 'fragments': 0})
+        entry['end'] = now
+        entry['bytes'] = max(entry['bytes'], d.get('downloaded_bytes') or d.get('total_bytes') or 0)
+        entry['fragments'] = max(entry['fragments'], d.get('fragment_index') or 0)
+        start = time.perf_counter()
+        self.hook(d)
+        self.hook_seconds += time.perf_counter() - start
+        self.hook_calls += 1
+
+    def postprocessed(self, d):
+        name = d.get('postprocessor')
+        if d.get('status') == 'started':
+            self._pp_started[name] = time.perf_counter()
+        elif d.get('status') == 'finished' and name in self._pp_started:
+            elapsed = time.perf_counter() - self._pp_started.pop(name)
+            self.postprocess[name] = self.postprocess.get(name, 0.0) + elapsed
+
+    def summary(self):
+        download_seconds = sum(f['end'] - f['start'] for f in self.files.values())
+        total_bytes = sum(f['bytes'] for f in self.files.values())
+        fragments = sum(f['fragments'] for f in self.files.values())
+        return {
+            'first_fragment_s': self.first_hook - self.started if self.first_hook else None,
+            'download_s': download_seconds,
+            'bytes': total_bytes,
+            'fragments': fragments,
+            'fragment_mib_s': total_bytes / 1024 ** 2 / download_seconds if download_seconds else None,
+            'fragments_per_s': fragments / download_seconds if download_seconds else None,
+            'postprocess_s': self.postprocess,
+            'hook_calls': self.hook_calls,
+            'hook_seconds': self.hook_seconds,
+            'hook_share': self.hook_seconds / download_seconds if download_seconds else None,
+        }
+
+
+def run_once(url, preset, outdir):
+    import yt_dlp
+    from core.downloader import YTDownloader
+    from core.job import DownloadJob
+
+    start = time.perf_counter()
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+        ydl.extract_info(url, download=False)
+    extract_seconds = time.perf_counter() - start
+
+    job = DownloadJob(url, outdir, preset)
+    probe = Probe(job._progress_hook)
+    probe.started = time.perf_counter()
+    error = None
+    try:
+        # Same call DownloadJob.download_yt makes, plus post-processor timing
+        with contextlib.redirect_stdout(sys.stderr):
+            YTDownloader().download(url, outdir, preset, process_callback=probe.progress, control=job.control,
+                                    postprocess_callback=probe.postprocessed)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    wall = time.perf_counter() - probe.started
+    outputs = [name for name in os.listdir(outdir) if not name.endswith(('.part', '.ytdl'))]
+    return {'extract_s': extract_seconds, 'wall_s': wall, 'error': error, 'outputs': outputs, **probe.summary()}
+
+
+def median_run(runs):
+    ok = [r for r in runs if not r['error']]
+    if not ok:
+        return runs[-1]
+    result = dict(ok[-1])
+    for key in ('extract_s', 'wall_s', 'first_fragment_s', 'download_s', 'fragment_mib_s', 'fragments_per_s',
+                'hook_seconds', 'hook_share'):
+        values = [r[key] for r in ok if r[key] is not None]
+        result[key] = statistics.median(values) if values else None
+    names = {name for r in ok for name in r['postprocess_s']}
+    result['postprocess_s'] = {name: statistics.median(r['postprocess_s'].get(name, 0.0) for r in ok)
+                               for name in sorted(names)}
+    result['runs'] = len(runs)
+    result['failed_runs'] = len(runs) - len(ok)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark YTDownloader end to end against a local site.')
+    parser.add_argument('--ffmpeg', default=shutil.which('ffmpeg'), help='ffmpeg used to build and merge media')
+    parser.add_argument('--duration', type=int, default=30, help='clip length in seconds')
+    parser.add_argument('--manifests', default=','.join(MANIFESTS))
+    parser.add_argument('--presets', help='comma-separated presets (default: all of the app)')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--output', help='JSON results path (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+    if not args.ffmpeg or not os.path.exists(args.ffmpeg):
+        parser.error('ffmpeg not found; pass --ffmpeg')
+
+    scratch = tempfile.mkdtemp(prefix='yoo_e2e_')
+    # Keep the app's caches, history and provisioning state out of the user profile
+    os.environ['LOCALAPPDATA'] = scratch
+    os.environ['PATH'] = os.path.dirname(os.path.abspath(args.ffmpeg)) + os.pathsep + os.environ.get('PATH', '')
+    sys.path.insert(0, ROOT)
+    from batch import FORMATS
+
+    presets = args.presets.split(',') if args.presets else FORMATS
+    manifests = args.manifests.split(',')
+    for manifest in manifests:
+        if manifest not in MANIFESTS:
+            parser.error(f'unknown manifest {manifest!r}; choose from {", ".join(MANIFESTS)}')
+
+    site_root = os.path.join(scratch, 'site')
+    start = time.perf_counter()
+    build_media(args.ffmpeg, site_root, args.duration)
+    print(f'built {args.duration}s test media in {time.perf_counter() - start:.1f}s')
+
+    results = []
+    try:
+        with FakeMediaSite(site_root) as site:
+            for manifest in manifests:
+                for preset in presets:
+                    runs = []
+                    for i in range(args.runs):
+                        outdir = os.path.join(scratch, 'out', f'{manifest}-{len(results)}-{i}')
+                        runs.append(run_once(site.url(MANIFESTS[manifest]), preset, outdir))
+                        shutil.rmtree(outdir, ignore_errors=True)
+                    result = {'manifest': manifest, 'preset': preset, **median_run(runs)}
+                    results.append(result)
+                    if result['error']:
+                        print(f"  {manifest:>4} {preset:<28} FAILED {result['error']}")
+                        continue
+                    pp = ', '.join(f'{name} {seconds:.2f}s' for name, seconds in result['postprocess_s'].items())
+                    print(f"  {manifest:>4} {preset:<28} extract {result['extract_s']:.2f}s  "
+                          f"first fragment {result['first_fragment_s'] or 0:.2f}s  "
+                          f"{result['fragment_mib_s'] or 0:7.1f} MiB/s  {result['fragments_per_s'] or 0:6.1f} frag/s  "
+                          f"hook {result['hook_calls']} calls ({(result['hook_share'] or 0) * 100:.2f}%)  "
+                          f"{pp or 'no post-processing'}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'benchmark': 'ytdl_e2e',
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'yt_dlp': __import__('yt_dlp').version.__version__,
+        'duration_s': args.duration,
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"ytdl_e2e-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
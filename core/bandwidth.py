@@ -0,0 +1,229 @@
+import datetime
+import threading
+import time
+from core.scheduler import host_key
+
+# Seconds of traffic a stream may send ahead of its rate (token bucket depth)
+BURST_SECONDS = 0.2
+# How often per-stream shares are recomputed from observed usage
+REBALANCE_INTERVAL = 0.5
+# Longest single sleep, so a cancelled stream notices within this time
+MAX_SLEEP = 0.25
+
+
+def parse_clock(text):
+    hours, minutes = text.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def schedule_limit(schedule, now=None):
+    """
+    Limit in bytes/s from the first schedule entry covering `now`, else None.
+    Entries look like {"from": "09:00", "to": "18:00", "limit": 1048576,
+    "days": [0, 1, 2, 3, 4]}; "days" (Monday = 0) is optional and a window may
+    wrap past midnight.
+    """
+    now = now or datetime.datetime.now()
+    minute = now.hour * 60 + now.minute
+    for entry in schedule or []:
+        days = entry.get('days')
+        start, end = parse_clock(entry['from']), parse_clock(entry['to'])
+        if start <= end:
+            inside = start <= minute < end
+            day = now.weekday()
+        else:
+            inside = minute >= start or minute < end
+            # After midnight the window belongs to the day it started on
+            day = now.weekday() if minute >= start else (now.weekday() - 1) % 7
+        if inside and (days is None or day in days):
+            return entry['limit']
+    return None
+
+
+def fair_shares(capacity, usage, shares):
+    """
+    Max-min fair split of `capacity` between streams.
+    `usage` is each stream's observed rate and `shares` its current share; a
+    stream using well under its share keeps a little more than it used and
+    the rest is split evenly between the streams that are hitting theirs.
+    """
+    if not usage:
+        return {}
+    result = {}
+    hungry = []
+    for stream, used in usage.items():
+        share = shares.get(stream)
+        if share and used < share * 0.8:
+            result[stream] = used * 1.25
+        else:
+            hungry.append(stream)
+    spare = capacity - sum(result.values())
+    if not hungry:
+        # Nobody is saturated: hand out what is left evenly
+        hungry = list(usage)
+        result = {}
+        spare = capacity
+    for stream in hungry:
+        result[stream] = spare / len(hungry)
+    floor = capacity / len(usage) / 8
+    return {stream: max(share, floor) for stream, share in result.items()}
+
+
+class BandwidthStream:
+    """
+    One download's handle on the limiter. All connections of the download
+    share it, so a segmented download gets the same share as a single one.
+    """
+
+    def __init__(self, limiter, host):
+        self.limiter = limiter
+        self.host = host
+        self.share = None
+        self.window_bytes = 0
+        self._tat = 0.0
+        self._lock = threading.Lock()
+
+    def throttle(self, n, control=None):
+        self.limiter.acquire(self, n, control)
+
+    def reserve(self, n):
+        return self.limiter.reserve(self, n)
+
+    def close(self):
+        self.limiter.unregister(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BandwidthLimiter:
+    """
+    Process-wide token-bucket limiter shared by every download.
+
+    `limit` caps the total rate, `host_limits` the rate per host (both in
+    bytes/s, 0 or None for no cap) and `schedule` overrides `limit` during
+    time windows, see schedule_limit(). Each active download holds a
+    BandwidthStream; every capped group (total, each host) is split fairly
+    between its streams, so one download with many connections cannot starve
+    the others.
+    """
+
+    def __init__(self, limit=0, host_limits=None, schedule=None):
+        self._lock = threading.Lock()
+        self._streams = set()
+        self._last_rebalance = 0.0
+        self.configure(limit, host_limits, schedule)
+
+    def configure(self, limit=0, host_limits=None, schedule=None):
+        with self._lock:
+            self.limit = limit or 0
+            self.host_limits = {host: rate for host, rate in (host_limits or {}).items() if rate}
+            self.schedule = list(schedule or [])
+            self._last_rebalance = 0.0
+
+    def current_limit(self):
+        scheduled = schedule_limit(self.schedule)
+        return self.limit if scheduled is None else scheduled
+
+    @property
+    def active(self):
+        return bool(self.limit or self.host_limits or self.schedule)
+
+    def register(self, host=None):
+        stream = BandwidthStream(self, host)
+        with self._lock:
+            self._streams.add(stream)
+            self._last_rebalance = 0.0
+        return stream
+
+    def unregister(self, stream):
+        with self._lock:
+            self._streams.discard(stream)
+            self._last_rebalance = 0.0
+
+    def acquire(self, stream, n, control=None):
+        """
+        Blocks until `stream` may account for `n` more bytes. Returns early
+        once `control` is stopped.
+        """
+        delay = self.reserve(stream, n)
+        while delay > 0:
+            if control is not None and control.stopped:
+                return
+            time.sleep(min(delay, MAX_SLEEP))
+            delay -= MAX_SLEEP
+
+    def reserve(self, stream, n):
+        """
+        Accounts `n` bytes to `stream` without blocking and returns how many
+        seconds its caller should wait before sending more (0 if none), for
+        callers that wait their own way, like the asyncio engine.
+        """
+        if n <= 0 or not self.active:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_rebalance >= REBALANCE_INTERVAL:
+                self._rebalance(now)
+            rate = stream.share
+        if not rate:
+            stream.window_bytes += n
+            return 0
+        with stream._lock:
+            stream.window_bytes += n
+            stream._tat = max(stream._tat, now) + n / rate
+            return max(0, stream._tat - now - BURST_SECONDS)
+
+    def _rebalance(self, now):
+        elapsed = now - self._last_rebalance if self._last_rebalance else None
+        self._last_rebalance = now
+        usage = {}
+        for stream in self._streams:
+            # Fresh streams (or a reset) count as hungry until measured
+            usage[stream] = stream.window_bytes / elapsed if elapsed else float('inf')
+            stream.window_bytes = 0
+
+        groups = []
+        total = self.current_limit()
+        if total:
+            groups.append((total, list(self._streams)))
+        for host, rate in self.host_limits.items():
+            members = [stream for stream in self._streams if stream.host == host]
+            if members:
+                groups.append((rate, members))
+
+        shares = {stream: None for stream in self._streams}
+        for capacity, members in groups:
+            current = {stream: stream.share for stream in members}
+            split = fair_shares(capacity, {stream: usage[stream] for stream in members}, current)
+            for stream, share in split.items():
+                shares[stream] = share if shares[stream] is None else min(shares[stream], share)
+        for stream, share in shares.items():
+            stream.share = share
+
+
+def configure_from_config(cfg, limiter=None):
+    """
+    Applies the 'bandwidth_*' config keys, which are in KiB/s. Host names
+    are matched like the scheduler's per-host limits (www. is ignored).
+    """
+    kib = 1024
+    schedule = [{**entry, 'limit': entry['limit'] * kib} for entry in cfg.get('bandwidth_schedule') or []]
+    host_limits = {host_key('http://' + host): rate * kib
+                   for host, rate in (cfg.get('bandwidth_host_limits') or {}).items()}
+    (limiter or get_limiter()).configure(cfg.get('bandwidth_limit', 0) * kib, host_limits, schedule)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = BandwidthLimiter()
+        return _limiter
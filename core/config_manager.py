@@ -3,6 +3,9 @@ from pathlib import Path
 import platform
 import sys
 import os
+import tempfile
+import threading
+import time
 APP_NAME = "yoo_front"
 ROOT = Path(os.getenv("LOCALAPPDATA", ".")) / APP_NAME
 
@@ -19,11 +22,22 @@ RESOURCE_BASE = Path(resource_path("."))
 
 SYSTEM = platform.system()
 CONFIG_PATH = ROOT / "config.json"
+SESSION_PATH = ROOT / "session.json"
 BIN_PATH = RESOURCE_BASE / "bin"
 DEFAULT_CONFIG = {
     'last_folder': str(Path.home()),
     'dark_mode': False,
-    'format_preset': 'Best (video+audio)'
+    'format_preset': 'Best (video+audio)',
+    'max_concurrent_downloads': 3,
+    'max_downloads_per_host': 2,
+    # ffmpeg merges / audio extractions at once, 0 = one per core
+    'max_postprocess_workers': 0,
+    # Hash every download (sha256) even without an expected digest
+    'hash_downloads': False,
+    # KiB/s, 0 = unlimited; see core.bandwidth for the schedule format
+    'bandwidth_limit': 0,
+    'bandwidth_host_limits': {},
+    'bandwidth_schedule': []
 }
 FFMPEG_PATH = Path(BIN_PATH) / ('ffmpeg.exe' if SYSTEM == 'Windows' else 'ffmpeg')
 FFPROBE_PATH = Path(BIN_PATH) / ('ffprobe.exe' if SYSTEM == 'Windows' else 'ffprobe')
@@ -46,9 +60,257 @@ def load_config():
     return DEFAULT_CONFIG.copy()
 
 
-def save_config(cfg):
+def atomic_write(path, text):
+    """
+    Writes `text` to a temp file beside `path`, syncs it and renames it over
+    `path`, so readers see either the old or the new file, never half of one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
     try:
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(cfg, f)
-    except Exception:
-        pass
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save_config(cfg):
+    """
+    Atomically rewrites config.json. Raises OSError on failure.
+    """
+    atomic_write(CONFIG_PATH, json.dumps(cfg, indent=1))
+
+
+class DebouncedWriter:
+    """
+    Runs write() on a background thread at most once per burst of schedule()
+    calls: `delay` seconds after the last one, but no later than `max_delay`
+    after the first, so a steady stream of changes still gets saved.
+    Errors go to on_error(exception) and are kept in `error`.
+    """
+
+    def __init__(self, write, delay=1.0, max_delay=5.0, on_error=None):
+        self.write = write
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_error = on_error
+        self.error = None
+        self._cond = threading.Condition()
+        self._first = None
+        self._last = None
+        self._closed = False
+        self._thread = None
+
+    def schedule(self):
+        with self._cond:
+            now = time.monotonic()
+            if self._first is None:
+                self._first = now
+            self._last = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """
+        Writes now, on the calling thread, if anything is scheduled.
+        """
+        with self._cond:
+            pending = self._first is not None
+            self._first = self._last = None
+        if pending:
+            self._write()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._first is None:
+                        self._cond.wait()
+                        continue
+                    due = min(self._last + self.delay, self._first + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                self._first = self._last = None
+            self._write()
+
+    def _write(self):
+        try:
+            self.write()
+            self.error = None
+        except Exception as e:
+            self.error = e
+            if self.on_error:
+                self.on_error(e)
+
+
+class SessionStore:
+    """
+    Crash-safe record of the link queue: an ordered map of item id -> fields
+    (url, title, state, progress, format, outdir...).
+
+    put()/remove() only touch memory; a DebouncedWriter appends the batched
+    changes to `<path>.log` (one JSON line each, synced). Once the log grows
+    past `compact_every` lines, and on close(), everything is rewritten
+    atomically into `path` and the log is emptied. load() replays the log
+    over the snapshot and ignores a torn last line.
+    """
+
+    def __init__(self, path=SESSION_PATH, delay=1.0, max_delay=5.0, compact_every=5000, on_error=None):
+        self.path = Path(path)
+        self.log_path = Path(str(path) + ".log")
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        # Serializes log appends and compaction
+        self._io_lock = threading.RLock()
+        self._items = {}
+        self._pending = {}
+        self._log_lines = 0
+        self._next_id = 1
+        self.writer = DebouncedWriter(self._write, delay, max_delay, on_error)
+
+    def load(self):
+        """
+        Reads the saved session; returns [(id, fields), ...] in queue order.
+        """
+        items = {}
+        next_id = 1
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            next_id = snapshot.get('next_id', 1)
+            items = {item_id: fields for item_id, fields in snapshot.get('items', [])}
+        except (OSError, ValueError):
+            pass
+        lines = 0
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item_id, fields = json.loads(line)
+                    except ValueError:
+                        break
+                    lines += 1
+                    if fields is None:
+                        items.pop(item_id, None)
+                    else:
+                        items.setdefault(item_id, {}).update(fields)
+                    next_id = max(next_id, item_id + 1)
+        except OSError:
+            pass
+        with self._lock:
+            self._items = items
+            self._next_id = max([next_id] + [item_id + 1 for item_id in items])
+            self._log_lines = lines
+        return list(items.items())
+
+    def add(self, **fields):
+        with self._lock:
+            item_id = self._next_id
+            self._next_id += 1
+            self._put(item_id, fields)
+        self.writer.schedule()
+        return item_id
+
+    def put(self, item_id, **fields):
+        with self._lock:
+            self._put(item_id, fields)
+        self.writer.schedule()
+
+    def _put(self, item_id, fields):
+        self._items.setdefault(item_id, {}).update(fields)
+        pending = self._pending.get(item_id)
+        if pending is None:
+            self._pending[item_id] = dict(fields)
+        else:
+            pending.update(fields)
+
+    def remove(self, item_id):
+        with self._lock:
+            self._items.pop(item_id, None)
+            self._pending[item_id] = None
+        self.writer.schedule()
+
+    def clear(self):
+        with self._lock:
+            for item_id in self._items:
+                self._pending[item_id] = None
+            self._items = {}
+        self.writer.schedule()
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+        self.compact()
+
+    def compact(self):
+        with self._io_lock:
+            with self._lock:
+                snapshot = {'version': 1, 'next_id': self._next_id,
+                            'items': [[item_id, dict(fields)] for item_id, fields in self._items.items()]}
+                # Changes still pending are part of the snapshot
+                pending, self._pending = self._pending, {}
+            try:
+                atomic_write(self.path, json.dumps(snapshot, separators=(',', ':')))
+                with open(self.log_path, 'w', encoding='utf-8'):
+                    pass
+            except BaseException:
+                self._requeue(pending)
+                raise
+            with self._lock:
+                self._log_lines = 0
+
+    def _write(self):
+        with self._io_lock:
+            with self._lock:
+                compact = self._log_lines + len(self._pending) > self.compact_every
+                if not compact:
+                    pending, self._pending = self._pending, {}
+            if compact:
+                self.compact()
+                return
+            if not pending:
+                return
+            text = ''.join(json.dumps([item_id, fields], separators=(',', ':')) + '\n'
+                           for item_id, fields in pending.items())
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except BaseException:
+                self._requeue(pending)
+                raise
+            with self._lock:
+                self._log_lines += len(pending)
+
+    def _requeue(self, pending):
+        # A failed write keeps its changes for the next attempt; newer ones win
+        with self._lock:
+            for item_id, fields in pending.items():
+                if item_id not in self._pending:
+                    self._pending[item_id] = fields
+                elif self._pending[item_id] is not None and fields is not None:
+                    self._pending[item_id] = {**fields, **self._pending[item_id]}
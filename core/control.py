@@ -0,0 +1,92 @@
+import socket
+import threading
+
+
+class Cancelled(Exception):
+    """
+    Raised inside a download engine once its DownloadControl is cancelled or
+    paused; `state` tells which.
+    """
+
+    def __init__(self, state):
+        super().__init__(state)
+        self.state = state
+
+
+class DownloadControl:
+    """
+    Cancel / pause handle shared between a job and the engine running it.
+    Engines call check() between chunks and register() anything blocking
+    (open responses) so cancel()/pause() can interrupt it from another thread.
+    Pausing stops the transfer like cancelling but keeps partial data, so the
+    next download of the same item resumes; the worker thread is released
+    either way.
+    """
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    CANCELLED = 'cancelled'
+
+    def __init__(self):
+        self.state = DownloadControl.RUNNING
+        self._lock = threading.Lock()
+        self._closers = {}
+        self._next_token = 0
+
+    @property
+    def stopped(self):
+        return self.state != DownloadControl.RUNNING
+
+    def cancel(self):
+        self._stop(DownloadControl.CANCELLED)
+
+    def pause(self):
+        self._stop(DownloadControl.PAUSED)
+
+    def _stop(self, state):
+        with self._lock:
+            if self.state == DownloadControl.CANCELLED:
+                return
+            self.state = state
+            closers = list(self._closers.values())
+        for close in closers:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def check(self):
+        if self.state != DownloadControl.RUNNING:
+            raise Cancelled(self.state)
+
+    def register(self, close):
+        """
+        Registers close() to run on cancel/pause; returns a token for unregister().
+        Runs it at once if the control is already stopped.
+        """
+        with self._lock:
+            if self.state == DownloadControl.RUNNING:
+                token = self._next_token
+                self._next_token += 1
+                self._closers[token] = close
+                return token
+        close()
+        return None
+
+    def unregister(self, token):
+        with self._lock:
+            self._closers.pop(token, None)
+
+
+def abort_response(response):
+    """
+    Interrupts a streaming requests response that another thread is blocked
+    reading: shutting the socket down makes the pending recv() return at once.
+    """
+    connection = getattr(response.raw, '_connection', None) or getattr(response.raw, 'connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
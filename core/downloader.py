@@ -1,77 +1,1045 @@
+import asyncio
+import errno
+import json
 import os
-import requests
-import shutil
-from tempfile import NamedTemporaryFile
-import yt_dlp
-from pathlib import Path
-from core.config_manager import BIN_PATH, FFMPEG_PATH, FFPROBE_PATH, SYSTEM
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from core.bandwidth import get_limiter
+from core.control import Cancelled, abort_response
+from core.http_pool import STATS, get_pool
+from core.integrity import ChecksumMismatch, DEFAULT_ALGORITHM, StreamHasher, parse_hash
+from core.postprocess import get_postprocess_pool
+from core.provisioning import ffmpeg_location, resolve_binaries
+from core.scheduler import host_key
 
 
+class RangeNotSupported(IOError):
+    pass
+
+
+class TruncatedResponse(IOError):
+    pass
+
+
+class DownloadJournal:
+    """
+    Small on-disk record of a partial download, kept next to the .part file:
+    url, validators (ETag / Last-Modified), total size and completed byte ranges.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def merge_ranges(ranges):
+    """
+    Merges half-open [start, stop) ranges into a sorted, non-overlapping list.
+    """
+    merged = []
+    for start, stop in sorted(ranges):
+        if stop <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return merged
+
+
+def preallocate(f, size):
+    """
+    Reserves `size` bytes for the open file `f` up front, so it does not
+    fragment while growing and a full disk fails now rather than near the end.
+    Falls back to a sparse truncate where posix_fallocate is missing (Windows)
+    or the filesystem does not support it.
+    """
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+    f.truncate(size)
+
+
+def is_encoded(response):
+    return response.headers.get("content-encoding", "identity").lower() not in ("", "identity")
+
+
+def content_range(response):
+    """
+    (start, end, total) from a 206 response's "Content-Range: bytes a-b/n",
+    with total None for "*"; None when the header is missing or malformed.
+    """
+    match = re.fullmatch(r"\s*bytes\s+(\d+)-(\d+)/(\d+|\*)\s*", response.headers.get("content-range", ""))
+    if match is None:
+        return None
+    start, end, total = match.groups()
+    return int(start), int(end), None if total == "*" else int(total)
+
+
+_known_urllib3 = None
+
+
+def direct_reads(raw):
+    """
+    True if `raw` is a urllib3 response whose http.client body can be read
+    straight into a buffer. That relies on urllib3 1.x / 2.x internals
+    (_fp, _fp_bytes_read, length_remaining), so other versions read through
+    raw.read() instead.
+    """
+    global _known_urllib3
+    if _known_urllib3 is None:
+        import urllib3
+
+        _known_urllib3 = urllib3.__version__.split(".")[0] in ("1", "2")
+    return (_known_urllib3
+            and all(hasattr(raw, name) for name in ("_fp", "_fp_bytes_read", "length_remaining"))
+            and hasattr(raw._fp, "readinto"))
+
+
+def read_into(response, view):
+    """
+    Reads the next bytes of a streaming requests response into `view` and
+    returns how many (0 at the end). Identity bodies are read by http.client
+    straight into the buffer, with urllib3's length bookkeeping kept in step;
+    content-encoded bodies, and urllib3 versions that direct_reads() does
+    not know, go through raw.read() and one copy.
+    """
+    raw = response.raw
+    if is_encoded(response) or not direct_reads(raw):
+        data = raw.read(len(view), decode_content=True)
+        view[:len(data)] = data
+        return len(data)
+    fp = raw._fp
+    n = fp.readinto(view) if not fp.isclosed() else 0
+    raw._fp_bytes_read += n
+    if raw.length_remaining is not None:
+        raw.length_remaining -= n
+    if not n:
+        if raw.length_remaining:
+            raise TruncatedResponse(f"Connection closed with {raw.length_remaining} bytes missing")
+        # Fully read: hand the connection back to the pool for reuse
+        raw.release_conn()
+    return n
+
+
+def report_progress(downloaded, total, progress_callback, status_callback):
+    # Update progress %
+    if total and progress_callback:
+        progress_callback(min(downloaded * 100 / total, 100.0))
+
+    # Update status text (e.g. "12.4 MB / 48 MB")
+    if status_callback and total:
+        mb_dl = downloaded / 1024 / 1024
+        mb_tot = total / 1024 / 1024
+        status_callback(f"{mb_dl:.1f} MB / {mb_tot:.1f} MB")
+
+
+def write_all(f, view):
+    # Unbuffered files may write less than asked
+    while view:
+        view = view[f.write(view):]
 
 
 class HttpDownloader:
     """
     A clean and simple streaming file downloader.
     Emits progress in percentage and status text (speed or bytes).
+    Large files on servers that accept byte ranges are split into segments
+    and fetched over several connections in parallel.
+    Data is written to `<filename>.part` with a journal beside it, so an
+    interrupted download resumes from the completed ranges on the next call.
+    An optional DownloadControl cancels or pauses the transfer: open responses
+    are aborted at once and Cancelled is raised, with the journal saved so a
+    paused download picks up where it stopped.
+    Every chunk is drawn from the shared BandwidthLimiter.
+    Bodies are requested without content encoding and read into one reusable
+    buffer per connection, then written unbuffered into the .part file,
+    which is preallocated to the full size when it is known.
+    With a TaskStats, received bytes and the fallback from ranged to single
+    connection (counted as a retry) are recorded in it.
+    With `hash_algorithm` (or an `expected_hash` such as "sha256:<hex>") the
+    digest is computed from the same buffers while writing and left in
+    `digest`; a mismatch with `expected_hash` deletes the file and raises
+    ChecksumMismatch.
     """
 
-    def __init__(self, url, filename=None, chunk_size=1024 * 256):
+    # (connect, read) seconds; bounds how long a stalled server can hold a thread
+    TIMEOUT = (10, 30)
+    # While hashing, ranged downloads fetch pieces of at most this size in file
+    # order, so writers stay close to the digest and read-backs hit the cache
+    HASH_SEGMENT = 1024 * 1024 * 8
+
+    def __init__(self, url, filename=None, chunk_size=1024 * 256, connections=4,
+                 min_segment_size=1024 * 1024 * 4, journal_interval=1.0, report_interval=0.1,
+                 control=None, stats=None, hash_algorithm=None, expected_hash=None):
         self.url = url
         self.filename = filename or os.path.basename(url)
         self.chunk_size = chunk_size
+        self.connections = max(1, connections)
+        self.min_segment_size = min_segment_size
+        self.journal_interval = journal_interval
+        self.report_interval = report_interval
+        self.control = control
+        self.stats = stats
+        self.expected_hash = parse_hash(expected_hash, hash_algorithm or DEFAULT_ALGORITHM) if expected_hash else None
+        self.hash_algorithm = self.expected_hash[0] if self.expected_hash else hash_algorithm
+        self.digest = None
+        self._hasher = None
+        self.part_path = self.filename + ".part"
+        self.journal = DownloadJournal(self.part_path + ".json")
+        self._lock = threading.Lock()
+        self._downloaded = 0
+        self._completed = []
+        self._active = {}
+        self._state = None
+        self._last_save = 0.0
+        self._last_report = 0.0
+        self._bandwidth = None
 
     def download(self, progress_callback=None, status_callback=None):
         """
         progress_callback(pct: float)
         status_callback(text: str)
         """
-        r = requests.get(self.url, stream=True)
-        total = int(r.headers.get("content-length", 0)) or None
+        self._check()
+        info = self.probe()
+        self._check()
+        with get_limiter().register(host_key(self.url)) as self._bandwidth:
+            if info["accepts_ranges"]:
+                try:
+                    return self._download_ranged(info, progress_callback, status_callback)
+                except RangeNotSupported:
+                    self.journal.discard()
+                    if self.stats is not None:
+                        self.stats.retry()
+            return self._download_single(progress_callback, status_callback)
+
+    def probe(self):
+        """
+        Returns total size, range support and validators from a HEAD request.
+        Asks for the identity encoding like the GETs do; a server that still
+        reports a Content-Encoding gets no ranged download, as its
+        Content-Length would not be the size of the bytes written.
+        """
+        import requests
+
+        info = {"total": None, "accepts_ranges": False, "etag": None, "last_modified": None}
+        try:
+            r = get_pool().head(self.url, headers={"Accept-Encoding": "identity"}, allow_redirects=True,
+                                timeout=10)
+        except requests.RequestException:
+            return info
+        if not r.ok:
+            return info
+        info["total"] = int(r.headers.get("content-length", 0)) or None
+        info["accepts_ranges"] = (r.headers.get("accept-ranges", "").lower() == "bytes"
+                                  and info["total"] is not None and not is_encoded(r))
+        info["etag"] = r.headers.get("etag")
+        info["last_modified"] = r.headers.get("last-modified")
+        return info
+
+    def partial_offset(self):
+        """
+        Bytes already on disk from an earlier, interrupted call (0 if none).
+        """
+        state = self.journal.load()
+        if not state or state.get("url") != self.url or not os.path.exists(self.part_path):
+            return 0
+        return sum(stop - start for start, stop in merge_ranges(state.get("completed", [])))
+
+    def discard_partial(self):
+        """
+        Removes the .part file and its journal, e.g. after a cancel.
+        """
+        for path in (self.part_path, self.journal.path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _check(self):
+        if self.control is not None:
+            self.control.check()
+
+    @contextmanager
+    def _open(self, headers=None):
+        """
+        Opens a streaming GET that the control can abort from another thread.
+        Yields the response. Once the control is stopped, whatever the abort
+        made the reading thread raise surfaces as Cancelled.
+        """
+        self._check()
+        # Ranges and preallocation refer to the bytes on disk, so ask for them as they are
+        headers = {"Accept-Encoding": "identity", **(headers or {})}
+        r = get_pool().get(self.url, headers=headers, stream=True, timeout=self.TIMEOUT)
+        token = self.control.register(lambda: abort_response(r)) if self.control is not None else None
+        try:
+            yield r
+        except Cancelled:
+            raise
+        except Exception as e:
+            # Closing the response under a blocked read can fail in any layer
+            # (e.g. AttributeError from http.client), not only as a network error
+            if self.control is not None and self.control.stopped:
+                raise Cancelled(self.control.state) from e
+            raise
+        finally:
+            if token is not None:
+                self.control.unregister(token)
+            r.close()
+
+    def _new_hasher(self):
+        self._hasher = StreamHasher(self.hash_algorithm) if self.hash_algorithm else None
+
+    def _finish_hash(self, size):
+        if self._hasher is None:
+            return
+        self.digest = self._hasher.finish(self.part_path, size)
+        if self.expected_hash and self.digest != self.expected_hash[1]:
+            self.discard_partial()
+            algorithm, expected = self.expected_hash
+            raise ChecksumMismatch(f"{os.path.basename(self.filename)}: expected {algorithm} {expected}, "
+                                   f"got {self.digest}")
+
+    def split(self, start, stop):
+        """
+        Splits [start, stop) into at most `connections` inclusive byte ranges.
+        """
+        size = stop - start
+        if size <= 0:
+            return []
+        count = min(self.connections, max(1, size // self.min_segment_size))
+        step = size // count
+        segments = []
+        for i in range(count):
+            seg_start = start + i * step
+            seg_end = stop - 1 if i == count - 1 else seg_start + step - 1
+            segments.append((seg_start, seg_end))
+        return segments
+
+    def _resume_state(self, info):
+        state = self.journal.load()
+        if not state:
+            return None
+        if state.get("url") != self.url or state.get("total") != info["total"]:
+            return None
+        for key in ("etag", "last_modified"):
+            if state.get(key) and info[key] and state[key] != info[key]:
+                return None
+        if not os.path.exists(self.part_path) or os.path.getsize(self.part_path) != info["total"]:
+            return None
+        return state
+
+    def _download_single(self, progress_callback, status_callback):
+        with self._open() as r:
+            total = int(r.headers.get("content-length", 0)) or None
+            self._downloaded = 0
+            self._new_hasher()
+            buffer = memoryview(bytearray(self.chunk_size))
+
+            with open(self.part_path, "wb", buffering=0) as f:
+                if total and not is_encoded(r):
+                    preallocate(f, total)
+                position = 0
+                while True:
+                    n = read_into(r, buffer)
+                    self._check()
+                    if not n:
+                        break
+
+                    write_all(f, buffer[:n])
+                    if self._hasher is not None:
+                        self._hasher.update(position, buffer[:n])
+                    position += n
+                    self._advance(n, total, progress_callback, status_callback)
+                    self._bandwidth.throttle(n, self.control)
+                f.truncate()
+
+        self._finish_hash(position)
+
+        os.replace(self.part_path, self.filename)
+        return self.filename
+
+    def _download_ranged(self, info, progress_callback, status_callback):
+        total = info["total"]
+        state = self._resume_state(info)
+        if state is None:
+            state = {"url": self.url, "etag": info["etag"], "last_modified": info["last_modified"],
+                     "total": total, "completed": []}
+            with open(self.part_path, "wb") as f:
+                preallocate(f, total)
+
+        self._state = state
+        self._completed = merge_ranges(state["completed"])
+        self._active = {}
+        self._downloaded = sum(stop - start for start, stop in self._completed)
+        self._last_save = time.monotonic()
+        if self._downloaded and status_callback:
+            status_callback(f"Resuming from {self._downloaded / 1024 / 1024:.1f} MB")
+        self.journal.save(state)
+        self._new_hasher()
+        if self._hasher is not None and self._completed:
+            # Bytes from the interrupted run never passed through this process
+            self._hasher.resume(self.part_path, self._completed)
+
+        segments = []
+        position = 0
+        for start, stop in self._completed + [[total, total]]:
+            segments.extend(self.split(position, start))
+            position = stop
+        if self._hasher is not None:
+            segments = [(piece, min(piece + self.HASH_SEGMENT - 1, end))
+                        for start, end in segments for piece in range(start, end + 1, self.HASH_SEGMENT)]
+
+        try:
+            if segments:
+                with ThreadPoolExecutor(max_workers=min(self.connections, len(segments))) as pool:
+                    futures = [
+                        pool.submit(self._fetch_segment, start, end, total,
+                                    progress_callback, status_callback)
+                        for start, end in segments
+                    ]
+                    for future in futures:
+                        future.result()
+        except BaseException:
+            with self._lock:
+                self._save_journal()
+            raise
+
+        self._finish_hash(total)
+        os.replace(self.part_path, self.filename)
+        self.journal.discard()
+        return self.filename
+
+    def _fetch_segment(self, start, end, total, progress_callback, status_callback):
+        headers = {"Range": f"bytes={start}-{end}"}
+        if self._state.get("etag"):
+            headers["If-Range"] = self._state["etag"]
+        with self._open(headers) as r:
+            if r.status_code != 206 or is_encoded(r):
+                raise RangeNotSupported(f"Server ignored range request ({r.status_code})")
+            if content_range(r) != (start, end, total):
+                raise RangeNotSupported(f"Server sent {r.headers.get('content-range')!r} "
+                                        f"for bytes {start}-{end}/{total}")
+            buffer = memoryview(bytearray(self.chunk_size))
+            with open(self.part_path, "r+b", buffering=0) as f:
+                f.seek(start)
+                position = start
+                while True:
+                    n = read_into(r, buffer)
+                    self._check()
+                    if not n:
+                        break
+                    write_all(f, buffer[:n])
+                    if self._hasher is not None:
+                        self._hasher.update(position, buffer[:n], self.part_path)
+                    position += n
+                    self._advance(n, total, progress_callback, status_callback,
+                                  segment=(start, position))
+                    self._bandwidth.throttle(n, self.control)
+
+    def _save_journal(self):
+        ranges = self._completed + [[start, stop] for start, stop in self._active.items()]
+        self._state["completed"] = merge_ranges(ranges)
+        self.journal.save(self._state)
+        self._last_save = time.monotonic()
+
+    def _advance(self, n, total, progress_callback, status_callback, segment=None):
+        with self._lock:
+            self._downloaded += n
+            downloaded = self._downloaded
+            if self.stats is not None:
+                self.stats.add_bytes(n)
+
+            now = time.monotonic()
+            if segment is not None:
+                self._active[segment[0]] = segment[1]
+                if now - self._last_save >= self.journal_interval:
+                    self._save_journal()
+
+            # Callbacks are throttled; the final chunk is always reported
+            if now - self._last_report < self.report_interval and downloaded != total:
+                return
+            self._last_report = now
+            report_progress(downloaded, total, progress_callback, status_callback)
+
+
+class HttpStatusError(IOError):
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+
+class AsyncResponse:
+    """
+    Status, headers and body of one response on an AsyncHttpEngine
+    connection. close() hands the connection back for reuse when the body
+    was read to the end, and frees its connection slot either way.
+    """
+
+    def __init__(self, engine, key, reader, writer, version, status, headers, release):
+        self.engine = engine
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.status = status
+        self.headers = headers
+        self._release = release
+        self.chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        length = headers.get("content-length")
+        self.length_remaining = int(length) if length is not None and not self.chunked else None
+        if status in (204, 304):
+            self.chunked, self.length_remaining = False, 0
+        self.reusable = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                         and (self.chunked or self.length_remaining is not None))
+        self.done = self.length_remaining == 0
+        self._chunk_left = 0
+
+    async def _timed(self, awaitable):
+        return await asyncio.wait_for(awaitable, self.engine.READ_TIMEOUT)
+
+    async def read(self, n):
+        """
+        Up to `n` body bytes; b"" at the end.
+        """
+        if self.done:
+            return b""
+        if self.chunked:
+            return await self._read_chunked(n)
+        if self.length_remaining is None:
+            # Close-delimited body
+            data = await self._timed(self.reader.read(n))
+            self.done = not data
+            return data
+        data = await self._timed(self.reader.read(min(n, self.length_remaining)))
+        if not data:
+            raise TruncatedResponse(f"Connection closed with {self.length_remaining} bytes missing")
+        self.length_remaining -= len(data)
+        self.done = self.length_remaining == 0
+        return data
+
+    async def _read_chunked(self, n):
+        if not self._chunk_left:
+            line = await self._timed(self.reader.readline())
+            if not line.endswith(b"\n"):
+                raise TruncatedResponse("Connection closed inside a chunked body")
+            self._chunk_left = int(line.split(b";")[0].strip() or b"0", 16)
+            if not self._chunk_left:
+                # Skip the trailer section
+                while await self._timed(self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.done = True
+                return b""
+        data = await self._timed(self.reader.read(min(n, self._chunk_left)))
+        if not data:
+            raise TruncatedResponse("Connection closed inside a chunked body")
+        self._chunk_left -= len(data)
+        if not self._chunk_left:
+            await self._timed(self.reader.readexactly(2))
+        return data
+
+    async def discard(self, limit=64 * 1024):
+        """
+        Reads away a small body so the connection can be reused, then closes.
+        """
+        try:
+            while not self.done and limit > 0:
+                limit -= len(await self.read(limit))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        self.close()
 
-        if total:
-            scale = 100 / total
+    def close(self):
+        if self._release is None:
+            return
+        if self.done and self.reusable:
+            self.engine._idle.setdefault(self.key, []).append((self.reader, self.writer))
         else:
-            scale = None
+            self.writer.close()
+        self._release()
+        self._release = None
+
+
+class AsyncHttpEngine:
+    """
+    One background asyncio loop multiplexing HTTP/1.1 transfers, for
+    batches of many small files where a thread per transfer is mostly idle
+    overhead. Keep-alive connections are pooled per host and limited like
+    the shared HttpPool's (its per-host pool size), plus `max_connections`
+    overall; requests and new connections are counted in the same stats.
+    File writes and hashing run on a few disk threads with one write in
+    flight per transfer, so a slow disk holds back the reads (and, through
+    TCP, the server) instead of buffering in memory.
+    Built on plain asyncio streams, so it needs no extra dependency; unlike
+    the requests-based engine it ignores proxy settings.
+    """
+
+    MAX_CONNECTIONS = 256
+    DISK_THREADS = 4
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 30
+    MAX_HEADER_SIZE = 64 * 1024
+    MAX_REDIRECTS = 10
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, disk_threads=DISK_THREADS):
+        self.max_connections = max_connections
+        self.disk = ThreadPoolExecutor(max_workers=disk_threads, thread_name_prefix="async-http-disk")
+        self.loop = asyncio.new_event_loop()
+        # Only touched from the loop thread
+        self._idle = {}
+        self._host_slots = {}
+        self._slots = None
+        self._ssl = None
+        self._user_agent = None
+        threading.Thread(target=self.loop.run_forever, name="async-http", daemon=True).start()
+
+    def submit(self, coro):
+        """
+        Schedules `coro` on the engine's loop; returns a concurrent Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
 
-        downloaded = 0
+    def run(self, coro):
+        """
+        Runs `coro` on the engine's loop and blocks until it is done.
+        """
+        return self.submit(coro).result()
+
+    async def on_disk(self, func, *args):
+        return await self.loop.run_in_executor(self.disk, func, *args)
+
+    def _ssl_context(self):
+        if self._ssl is None:
+            import ssl
+            from requests.utils import DEFAULT_CA_BUNDLE_PATH
+
+            self._ssl = ssl.create_default_context(cafile=DEFAULT_CA_BUNDLE_PATH)
+        return self._ssl
+
+    def _headers(self, netloc, extra):
+        if self._user_agent is None:
+            # Same identity as the requests session
+            self._user_agent = get_pool().session.headers.get("User-Agent", "yoo_front")
+        headers = {"Host": netloc, "User-Agent": self._user_agent, "Accept": "*/*",
+                   "Accept-Encoding": "identity", "Connection": "keep-alive", **(extra or {})}
+        return headers
 
-        with NamedTemporaryFile(delete=False) as temp:
-            for chunk in r.iter_content(chunk_size=self.chunk_size):
-                if not chunk:
-                    continue
+    async def _acquire_slot(self, key, netloc):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        host_slots = self._host_slots.get(key)
+        if host_slots is None:
+            pool = get_pool()
+            host_slots = self._host_slots[key] = asyncio.Semaphore(pool.host_limits.get(netloc, pool.pool_maxsize))
+        await self._slots.acquire()
+        try:
+            await host_slots.acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        def release():
+            host_slots.release()
+            self._slots.release()
+        return release
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        https = scheme == "https"
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl_context() if https else None,
+                                    server_hostname=host if https else None, limit=self.MAX_HEADER_SIZE),
+            self.CONNECT_TIMEOUT)
+        STATS.count_connection()
+        return reader, writer
+
+    def _idle_connection(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+
+    async def request(self, url, headers=None):
+        """
+        Sends a GET, following redirects, and returns the AsyncResponse once
+        its headers are in. Error statuses raise HttpStatusError.
+        """
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = await self._send(url, headers)
+            location = response.headers.get("location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                await response.discard()
+                url = urljoin(url, location)
+                continue
+            if response.status >= 400:
+                await response.discard()
+                raise HttpStatusError(response.status, url)
+            return response
+        raise IOError(f"Too many redirects for {url}")
 
-                temp.write(chunk)
-                downloaded += len(chunk)
+    async def _send(self, url, headers):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        netloc = parts.netloc.rpartition("@")[2]
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [f"GET {target} HTTP/1.1"] + [f"{name}: {value}" for name, value
+                                              in self._headers(netloc, headers).items()]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
 
-                # Update progress %
-                if scale:
-                    pct = downloaded * scale
-                    if progress_callback:
-                        progress_callback(min(pct, 100.0))
+        release = await self._acquire_slot(key, netloc.lower())
+        try:
+            while True:
+                idle = self._idle_connection(key)
+                reader, writer = idle or await self._connect(key)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.READ_TIMEOUT)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    # A kept-alive connection the server has dropped meanwhile: retry on a fresh one
+                    if idle is None:
+                        raise
+                except asyncio.LimitOverrunError:
+                    writer.close()
+                    raise IOError(f"Response headers from {parts.hostname} are too large")
+                except BaseException:
+                    writer.close()
+                    raise
+            STATS.count_request()
+            status_line, *header_lines = head.decode("latin-1").split("\r\n")
+            version, status = status_line.split(" ", 2)[:2]
+            response_headers = {}
+            for line in header_lines:
+                name, sep, value = line.partition(":")
+                if sep:
+                    response_headers[name.strip().lower()] = value.strip()
+            return AsyncResponse(self, key, reader, writer, version, int(status), response_headers, release)
+        except BaseException:
+            release()
+            raise
 
-                # Update status text (e.g. "12.4 MB / 48 MB")
-                if status_callback and total:
-                    mb_dl = downloaded / 1024 / 1024
-                    mb_tot = total / 1024 / 1024
-                    status_callback(f"{mb_dl:.1f} MB / {mb_tot:.1f} MB")
 
-        shutil.move(temp.name, self.filename)
+class AsyncHttpDownloader:
+    """
+    HttpDownloader's contract on the shared AsyncHttpEngine: the same
+    progress / status callbacks, .part file and journal, DownloadControl,
+    BandwidthLimiter, TaskStats and hashing. Meant for many small files, so
+    it uses one connection per file and no HEAD probe; an interrupted
+    download resumes from the end of its .part file with a Range request
+    (If-Range guarded when the server gave a validator).
+    download() blocks the calling thread; download_async() is the same
+    transfer as a coroutine for code already running on the engine's loop.
+    """
+
+    def __init__(self, url, filename=None, chunk_size=1024 * 64, report_interval=0.1, control=None, stats=None,
+                 hash_algorithm=None, expected_hash=None, engine=None):
+        self.url = url
+        self.filename = filename or os.path.basename(url)
+        self.chunk_size = chunk_size
+        self.report_interval = report_interval
+        self.control = control
+        self.stats = stats
+        self.expected_hash = parse_hash(expected_hash, hash_algorithm or DEFAULT_ALGORITHM) if expected_hash else None
+        self.hash_algorithm = self.expected_hash[0] if self.expected_hash else hash_algorithm
+        self.digest = None
+        self.engine = engine
+        self.part_path = self.filename + ".part"
+        self.journal = DownloadJournal(self.part_path + ".json")
+        self._last_report = 0.0
+
+    def partial_offset(self):
+        """
+        Bytes at the start of the .part file kept from an earlier call (0 if none).
+        """
+        state = self.journal.load()
+        if not state or state.get("url") != self.url or not os.path.exists(self.part_path):
+            return 0
+        completed = merge_ranges(state.get("completed", []))
+        return completed[0][1] if completed and completed[0][0] == 0 else 0
+
+    def discard_partial(self):
+        for path in (self.part_path, self.journal.path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _check(self):
+        if self.control is not None:
+            self.control.check()
+
+    def download(self, progress_callback=None, status_callback=None):
+        """
+        progress_callback(pct: float)
+        status_callback(text: str)
+        """
+        engine = self.engine or get_async_engine()
+        return engine.run(self.download_async(progress_callback, status_callback, engine))
+
+    async def download_async(self, progress_callback=None, status_callback=None, engine=None):
+        engine = engine or self.engine or get_async_engine()
+        self._check()
+        task = asyncio.current_task()
+        token = None
+        if self.control is not None:
+            token = self.control.register(lambda: engine.loop.call_soon_threadsafe(task.cancel))
+        try:
+            with get_limiter().register(host_key(self.url)) as bandwidth:
+                return await self._transfer(engine, bandwidth, progress_callback, status_callback)
+        except asyncio.CancelledError:
+            if self.control is None or not self.control.stopped:
+                raise
+            task.uncancel()
+            raise Cancelled(self.control.state)
+        finally:
+            if token is not None:
+                self.control.unregister(token)
+
+    async def _transfer(self, engine, bandwidth, progress_callback, status_callback):
+        state, offset = await engine.on_disk(lambda: (self.journal.load(), self.partial_offset()))
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if state.get("etag") or state.get("last_modified"):
+                headers["If-Range"] = state.get("etag") or state.get("last_modified")
+        response = await engine.request(self.url, headers)
+        if response.status == 206 and not self._resumes(response, state, offset):
+            # A 206 for some other range would be written at the wrong offset
+            await response.discard()
+            if status_callback:
+                status_callback("Server sent a different range, restarting")
+            response = await engine.request(self.url, {})
+        try:
+            if response.status != 206:
+                offset = 0
+            elif status_callback:
+                status_callback(f"Resuming from {offset / 1024 / 1024:.1f} MB")
+            length = response.length_remaining
+            total = offset + length if length is not None else None
+            state = {"url": self.url, "etag": response.headers.get("etag"),
+                     "last_modified": response.headers.get("last-modified"), "total": total, "completed": []}
+            return await self._write_body(engine, response, bandwidth, state, offset, total,
+                                          progress_callback, status_callback)
+        finally:
+            response.close()
+
+    @staticmethod
+    def _resumes(response, state, offset):
+        """
+        Whether a 206 answers "bytes=offset-" for the file the journal saw.
+        """
+        cr = content_range(response)
+        if cr is None or cr[0] != offset or not offset:
+            return False
+        start, end, total = cr
+        if response.length_remaining is not None and end - start + 1 != response.length_remaining:
+            return False
+        return total is None or state.get("total") in (None, total)
+
+    async def _write_body(self, engine, response, bandwidth, state, offset, total, progress_callback,
+                          status_callback):
+        hasher = StreamHasher(self.hash_algorithm) if self.hash_algorithm else None
+        f = await engine.on_disk(open, self.part_path, "r+b" if offset else "wb", 0)
+        written = [offset]
+        pending = None
+        try:
+            if offset:
+                await engine.on_disk(f.seek, offset)
+                if hasher is not None:
+                    await engine.on_disk(hasher.resume, self.part_path, [[0, offset]])
+            if total:
+                await engine.on_disk(preallocate, f, total)
+
+            def write(data, position):
+                write_all(f, data)
+                if hasher is not None:
+                    hasher.update(position, data)
+                written[0] = position + len(data)
+
+            position = offset
+            self._last_report = 0.0
+            while True:
+                data = await response.read(self.chunk_size)
+                self._check()
+                if not data:
+                    break
+                # One write in flight: the next read waits for the disk
+                if pending is not None:
+                    await pending
+                pending = engine.loop.run_in_executor(engine.disk, write, data, position)
+                position += len(data)
+                if self.stats is not None:
+                    self.stats.add_bytes(len(data))
+                self._report(position, total, progress_callback, status_callback)
+                delay = bandwidth.reserve(len(data))
+                if delay:
+                    await asyncio.sleep(delay)
+            if pending is not None:
+                await pending
+                pending = None
+            await engine.on_disk(f.truncate)
+        except BaseException:
+            if pending is not None:
+                await asyncio.gather(pending, return_exceptions=True)
+            if written[0]:
+                # Keep what is on disk so the next call resumes from it
+                state["completed"] = [[0, written[0]]]
+                await engine.on_disk(self.journal.save, state)
+            raise
+        finally:
+            await engine.on_disk(f.close)
+
+        if hasher is not None:
+            self.digest = await engine.on_disk(hasher.finish, self.part_path, position)
+            if self.expected_hash and self.digest != self.expected_hash[1]:
+                await engine.on_disk(self.discard_partial)
+                algorithm, expected = self.expected_hash
+                raise ChecksumMismatch(f"{os.path.basename(self.filename)}: expected {algorithm} {expected}, "
+                                       f"got {self.digest}")
+        await engine.on_disk(os.replace, self.part_path, self.filename)
+        if offset:
+            await engine.on_disk(self.journal.discard)
         return self.filename
 
+    def _report(self, downloaded, total, progress_callback, status_callback):
+        # Callbacks are throttled; the final chunk is always reported
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval and downloaded != total:
+            return
+        self._last_report = now
+        report_progress(downloaded, total, progress_callback, status_callback)
+
+
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    global _async_engine
+    with _async_engine_lock:
+        if _async_engine is None:
+            _async_engine = AsyncHttpEngine()
+        return _async_engine
+
+
+# Resolved format URLs are signed and expire; reuse an extraction only while young
+INFO_MAX_AGE = 30 * 60
+INFO_EXPIRE_MARGIN = 5 * 60
+
+
+def info_is_fresh(info, max_age=INFO_MAX_AGE):
+    """
+    True when a metadata-pass info dict can be handed straight to the download
+    without extracting again: it has formats, is recent, and none of its format
+    URLs carries an `expire=` timestamp that is about to pass.
+    """
+    if not info or not info.get('formats') or info.get('_type', 'video') != 'video':
+        return False
+    fetched_at = info.get('_fetched_at')
+    now = time.time()
+    if fetched_at is None or now - fetched_at > max_age:
+        return False
+    for f in info['formats']:
+        expire = parse_qs(urlsplit(f.get('url') or '').query).get('expire')
+        if expire and expire[0].isdigit() and int(expire[0]) < now + INFO_EXPIRE_MARGIN:
+            return False
+    return True
+
 
 class YTDownloader:
+    """
+    yt-dlp download with the app's format presets.
+    With a DownloadControl, cancel/pause is checked on every progress and
+    post-processing hook and raises Cancelled; `socket_timeout` bounds how
+    long a stalled read can delay that. yt-dlp keeps its .part files, so a
+    paused download continues from them next time.
+    Downloaded bytes are drawn from the shared BandwidthLimiter in a progress
+    hook; yt-dlp's own `ratelimit` is per instance and cannot be shared.
+    With a TaskStats, the end of extraction (yt-dlp's match filter runs right
+    before the download), bytes, retries and post-processing stages go into it.
+    Post-processing (merging, audio extraction, fixups) waits for a worker of
+    the shared PostProcessPool; `handoff` is called first, once the network
+    part is over, so the caller can give its download slot to the next job.
+    """
+
+    # Seconds a read may block before yt-dlp gives up (its default is 20 too,
+    # but set here explicitly since cancellation latency depends on it)
+    SOCKET_TIMEOUT = 20
+
+    def download(self, url, outdir, fmt='best', process_callback=None, info=None, control=None, archive=None,
+                 postprocess_callback=None, stats=None, handoff=None):
+        import yt_dlp
 
-    def download(self, url, outdir, fmt='best', process_callback=None):
-        self.stop_requested = False
         os.makedirs(outdir, exist_ok=True)
+        hooks = [process_callback] if process_callback else []
+        bandwidth = get_limiter().register(host_key(url))
+        hooks.append(self._bytes_hook(bandwidth, control, stats))
+        if control is not None:
+            hooks.append(lambda d: self._check(control))
         opts = {
             'outtmpl': os.path.join(outdir, '%(title)s.%(ext)s'),
             'quiet': True,
             'no_warnings': True,
             'merge_output_format': 'mp4',
-            'progress_hooks': [process_callback] if process_callback else [],
-            'ffmpeg_location': str(BIN_PATH / 'ffmpeg.exe'),
+            'progress_hooks': hooks,
+            'socket_timeout': self.SOCKET_TIMEOUT,
         }
+        if archive is not None:
+            # Anything in the archive is skipped right after extraction
+            opts['download_archive'] = archive
+        if stats is not None:
+            opts['match_filter'] = self._extraction_mark(stats)
+            opts['logger'] = RetryCountingLogger(stats)
+        if get_limiter().active:
+            # Keep yt-dlp's read blocks small so the hook can pace them smoothly
+            opts.update({'buffersize': 1024 * 64, 'noresizebuffer': True})
+        stage = PostProcessStage(control, handoff, stats)
+        pp_hooks = [stage.hook]
+        if postprocess_callback:
+            pp_hooks.append(postprocess_callback)
+        if stats is not None:
+            pp_hooks.append(lambda d: stats.stage(d.get('postprocessor'), d.get('status')))
+        if control is not None:
+            pp_hooks.append(lambda d: self._check(control))
+        opts['postprocessor_hooks'] = pp_hooks
+        location = ffmpeg_location()
+        if location:
+            opts['ffmpeg_location'] = location
         if fmt == 'Audio (mp3)':
             opts.update({'format': 'bestaudio', 'postprocessors': [{
                 'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'
@@ -94,46 +1062,122 @@ class YTDownloader:
             })
 
         print(f"Downloading with options: {opts}")
-        with yt_dlp.YoutubeDL(opts) as ydl:
+        with bandwidth, stage, yt_dlp.YoutubeDL(opts) as ydl:
             try:
+                if info_is_fresh(info):
+                    try:
+                        # Reuse the metadata pass: only format selection and download run
+                        return ydl.process_ie_result(dict(info), download=True)
+                    except yt_dlp.utils.DownloadCancelled:
+                        raise
+                    except yt_dlp.utils.DownloadError:
+                        ydl.report_warning(f"Cached extraction failed for {url}, extracting again")
                 info = ydl.extract_info(url, download=True)
                 return info
             except yt_dlp.utils.DownloadCancelled:
-                pass
+                if control is not None and control.stopped:
+                    raise Cancelled(control.state)
+
+    @staticmethod
+    def _bytes_hook(bandwidth, control, stats=None):
+        seen = {}
+
+        def hook(d):
+            if d.get('status') != 'downloading':
+                return
+            key = d.get('tmpfilename') or d.get('filename')
+            downloaded = d.get('downloaded_bytes') or 0
+            # A restarted file reports from zero again
+            delta = downloaded - seen.get(key, 0) if downloaded >= seen.get(key, 0) else downloaded
+            seen[key] = downloaded
+            if stats is not None:
+                stats.add_bytes(delta)
+            bandwidth.throttle(delta, control)
+        return hook
 
+    @staticmethod
+    def _extraction_mark(stats):
+        def match_filter(info, incomplete=False):
+            # Called for every complete video just before its download starts
+            if not incomplete:
+                stats.extraction_done()
+            return None
+        return match_filter
 
-def download_missing_binaries():
-
-    binaries = {
-        "Linux": {
-            "ffmpeg": {"exe": "ffmpeg-linux64-v4.1", 'path': FFMPEG_PATH},
-            "ffprobe": {"exe": "ffprobe-linux64-v4.1", 'path': FFPROBE_PATH},
-
-        },
-        "Darwin": {
-            "ffmpeg": {"exe": "ffmpeg-osx64-v4.1", 'path': FFMPEG_PATH},
-            "ffprobe": {"exe": "ffprobe-osx64-v4.1", 'path': FFPROBE_PATH},
-
-        },
-        "Windows": {
-            "ffmpeg": {"exe": "ffmpeg-win64-v4.1.exe", 'path': FFMPEG_PATH},
-            "ffprobe": {"exe": "ffprobe-win64-v4.1.exe", 'path': FFPROBE_PATH},
-
-        },
-    }
-
-    bin_dir = Path(BIN_PATH)
-    bin_dir.mkdir(exist_ok=True)
-    print(f"Checking binaries in {bin_dir}")
-    dependancies = ['ffmpeg', 'ffprobe']
-    for dep in dependancies:
-        file = binaries[SYSTEM][dep]
-        url = (
-            "https://github.com/imageio/imageio-binaries/raw/183aef992339cc5a463528c75dd298db15fd346f/ffmpeg/"
-            + file["exe"]
-        )
-        if not file['path'].exists():
-            print(f"Downloading missing binary: {dep} from {url}")
-            httpDownloader = HttpDownloader(url=url, filename=str(file['path']))
-            httpDownloader.download()
-            print(f"Downloaded {dep} to {file['path']}")
+    @staticmethod
+    def _check(control):
+        if control.stopped:
+            from yt_dlp.utils import DownloadCancelled
+
+            raise DownloadCancelled(control.state)
+
+
+class PostProcessStage:
+    """
+    Postprocessor hook that moves one yt-dlp download into the post-processing
+    pool when its first post-processor starts, and out again when the
+    download call returns (used as a context manager around it).
+    """
+
+    def __init__(self, control=None, handoff=None, stats=None):
+        self.control = control
+        self.handoff = handoff
+        self.stats = stats
+        self.entered = False
+        self.holding = False
+
+    def hook(self, d):
+        if self.entered or d.get('status') != 'started':
+            return
+        self.entered = True
+        if self.handoff is not None:
+            self.handoff()
+        waited = get_postprocess_pool().acquire(self.control)
+        if waited is None:
+            YTDownloader._check(self.control)
+            return
+        self.holding = True
+        if self.stats is not None:
+            self.stats.postprocess_queued(waited)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.holding:
+            self.holding = False
+            get_postprocess_pool().release()
+        return False
+
+
+class RetryCountingLogger:
+    """
+    yt-dlp logger as quiet as quiet/no_warnings, except that errors still go
+    to stderr; fragment, HTTP and extractor retry notices are counted.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def _count(self, msg):
+        if 'Retrying' in msg:
+            self.stats.retry()
+
+    def debug(self, msg):
+        self._count(msg)
+
+    def info(self, msg):
+        self._count(msg)
+
+    def warning(self, msg):
+        self._count(msg)
+
+    def error(self, msg):
+        print(msg, file=sys.stderr)
+
+
+def download_missing_binaries(status_callback=None):
+    """
+    Makes sure ffmpeg and ffprobe are usable; see core.provisioning.
+    """
+    return resolve_binaries(status_callback=status_callback)
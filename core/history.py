@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import threading
+import time
+
+from core.config_manager import ROOT
+
+HISTORY_PATH = ROOT / "history.sqlite3"
+# Format key used for plain HTTP downloads, which have no preset
+HTTP_FORMAT = "http"
+
+
+def info_key(info):
+    """
+    "<Extractor>:<video id>" for a yt-dlp info dict, same as
+    metadata_cache.canonical_key; None when the dict lacks either.
+    """
+    if info and info.get("extractor_key") and info.get("id"):
+        return f"{info['extractor_key']}:{info['id']}"
+    return None
+
+
+def archive_id(key):
+    """
+    yt-dlp's download-archive id ("youtube dQw4w9WgXcQ") for a history key.
+    """
+    if "://" in key:
+        return None
+    extractor, _, video_id = key.partition(":")
+    return f"{extractor.lower()} {video_id}" if video_id else None
+
+
+class HistoryArchive:
+    """
+    Set-like view of the history for one format preset, passed to yt-dlp as
+    `download_archive` so it skips videos found here. yt-dlp's own add() is
+    ignored: DownloadJob records the finished file with its path and hash.
+    """
+
+    def __init__(self, history, fmt):
+        self.history = history
+        self.fmt = fmt
+
+    def __contains__(self, vid_id):
+        return self.history.find_archive_id(vid_id, self.fmt) is not None
+
+    def __bool__(self):
+        return True
+
+    def add(self, vid_id):
+        pass
+
+
+class DownloadHistory:
+    """
+    Index of finished downloads keyed by (extractor:id, format preset), with
+    the output path, size and SHA-256 of the file. URLs a download was added
+    by map to its key, so a link seen before is found with one indexed query
+    and no network. Entries whose file was deleted or changed size are
+    dropped when looked up.
+    """
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS downloads (
+                key TEXT,
+                format TEXT,
+                archive_id TEXT,
+                path TEXT,
+                size INTEGER,
+                sha256 TEXT,
+                completed REAL,
+                PRIMARY KEY (key, format)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS downloads_archive ON downloads (archive_id, format)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, key TEXT)")
+        self._db.commit()
+
+    def _row(self, where, params):
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT key, format, path, size, sha256, completed FROM downloads WHERE {where}", params
+            ).fetchone()
+        if row is None:
+            return None
+        key, fmt, path, size, sha256, completed = row
+        try:
+            unchanged = os.path.getsize(path) == size
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            self.forget(key, fmt)
+            return None
+        return {"key": key, "format": fmt, "path": path, "size": size, "sha256": sha256, "completed": completed}
+
+    def find(self, key, fmt):
+        """
+        Returns the record for `key` in format `fmt`, or None.
+        """
+        return self._row("key = ? AND format = ?", (key, fmt))
+
+    def find_url(self, url, fmt):
+        with self._lock:
+            row = self._db.execute("SELECT key FROM urls WHERE url = ?", (url,)).fetchone()
+        return self.find(row[0], fmt) if row else None
+
+    def find_archive_id(self, vid_id, fmt):
+        return self._row("archive_id = ? AND format = ?", (vid_id, fmt))
+
+    def record(self, key, fmt, path, sha256=None, urls=()):
+        """
+        Records a finished download, with its `sha256` when the download was hashed.
+        """
+        size = os.path.getsize(path)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, fmt, archive_id(key), os.path.abspath(path), size, sha256, time.time())
+            )
+            self._db.executemany("INSERT OR REPLACE INTO urls VALUES (?, ?)",
+                                 [(url, key) for url in urls if url])
+            self._db.commit()
+
+    def alias(self, url, key):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, key))
+            self._db.commit()
+
+    def forget(self, key, fmt):
+        with self._lock:
+            self._db.execute("DELETE FROM downloads WHERE key = ? AND format = ?", (key, fmt))
+            self._db.commit()
+
+    def archive(self, fmt):
+        return HistoryArchive(self, fmt)
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = DownloadHistory()
+        return _history
@@ -0,0 +1,150 @@
+import threading
+
+DEFAULT_POOL_CONNECTIONS = 16   # distinct hosts kept alive
+DEFAULT_POOL_MAXSIZE = 8        # keep-alive connections per host
+
+
+class PoolStats:
+    """
+    Process-wide counters: requests sent vs TCP/TLS connections opened.
+    Everything not opened fresh was served by a reused keep-alive connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': max(0, self.requests - self.new_connections),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+
+STATS = PoolStats()
+
+
+_adapter_class = None
+
+
+def counting_adapter():
+    """
+    HTTPAdapter subclass that feeds STATS. Built on first use so importing
+    this module does not pull in requests/urllib3.
+    """
+    global _adapter_class
+    if _adapter_class is not None:
+        return _adapter_class
+
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _new_conn(self):
+            STATS.count_connection()
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            STATS.count_connection()
+            return super()._new_conn()
+
+    class CountingAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                'http': CountingHTTPConnectionPool,
+                'https': CountingHTTPSConnectionPool,
+            }
+
+        def send(self, request, *args, **kwargs):
+            STATS.count_request()
+            return super().send(request, *args, **kwargs)
+
+    _adapter_class = CountingAdapter
+    return _adapter_class
+
+
+class HttpPool:
+    """
+    One shared requests.Session for the whole app, so thumbnails, binaries and
+    direct downloads reuse keep-alive connections instead of a fresh TCP+TLS
+    handshake per request. Hosts can get their own pool size via set_host_limit.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.host_limits = {}
+        self._lock = threading.Lock()
+        self.session = self._build_session()
+
+    def _build_session(self):
+        import requests
+
+        session = requests.Session()
+        adapter = counting_adapter()(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        for host, maxsize in self.host_limits.items():
+            self._mount_host(session, host, maxsize)
+        return session
+
+    @staticmethod
+    def _mount_host(session, host, maxsize):
+        adapter = counting_adapter()(pool_connections=1, pool_maxsize=maxsize)
+        session.mount(f'http://{host}/', adapter)
+        session.mount(f'https://{host}/', adapter)
+
+    def set_host_limit(self, host, maxsize):
+        with self._lock:
+            self.host_limits[host] = maxsize
+            self._mount_host(self.session, host, maxsize)
+
+    def configure(self, pool_connections=None, pool_maxsize=None, host_limits=None):
+        with self._lock:
+            if pool_connections:
+                self.pool_connections = pool_connections
+            if pool_maxsize:
+                self.pool_maxsize = pool_maxsize
+            if host_limits:
+                self.host_limits.update(host_limits)
+            old, self.session = self.session, self._build_session()
+        old.close()
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.session.head(url, **kwargs)
+
+    def stats(self):
+        return STATS.snapshot()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HttpPool()
+        return _pool
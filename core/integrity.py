@@ -0,0 +1,133 @@
+import hashlib
+import threading
+
+ALGORITHMS = ("sha256", "blake2b")
+DEFAULT_ALGORITHM = "sha256"
+
+
+class ChecksumMismatch(IOError):
+    pass
+
+
+def parse_hash(text, default=DEFAULT_ALGORITHM):
+    """
+    "sha256:ab12..." / "blake2b:..." / a bare hex digest -> (algorithm, hex).
+    """
+    algorithm, sep, value = text.strip().partition(":")
+    if not sep:
+        algorithm, value = default, algorithm
+    algorithm = algorithm.lower()
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+    return algorithm, value.lower()
+
+
+def format_hash(algorithm, hexdigest):
+    return f"{algorithm}:{hexdigest}"
+
+
+def file_digest(path, algorithm=DEFAULT_ALGORITHM, start=0, stop=None, chunk_size=1024 * 1024):
+    digest = hashlib.new(algorithm)
+    _update_from_file(digest, path, start, stop, chunk_size)
+    return digest.hexdigest()
+
+
+def _update_from_file(digest, path, start, stop=None, chunk_size=1024 * 1024):
+    buffer = memoryview(bytearray(chunk_size))
+    with open(path, "rb", buffering=0) as f:
+        f.seek(start)
+        remaining = None if stop is None else stop - start
+        while remaining is None or remaining > 0:
+            n = f.readinto(buffer if remaining is None else buffer[:min(chunk_size, remaining)])
+            if not n:
+                break
+            digest.update(buffer[:n])
+            if remaining is not None:
+                remaining -= n
+
+
+class StreamHasher:
+    """
+    Incremental digest of a file written as byte ranges, possibly out of order
+    and from several threads. The writer whose bytes start where the digest
+    stands hashes them straight from its buffer; bytes written ahead of that
+    are only noted, and read back from the file once the digest reaches them.
+    With ranges fetched roughly in file order that is a short hop through the
+    page cache, not a second pass over the disk. finish() hashes whatever is
+    left (e.g. ranges completed by an earlier, interrupted run).
+    """
+
+    def __init__(self, algorithm=DEFAULT_ALGORITHM):
+        self.algorithm = algorithm
+        self.offset = 0
+        self._digest = hashlib.new(algorithm)
+        self._ahead = []
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def update(self, position, data, path=None):
+        """
+        Call after writing `data` at `position`; `path` lets the caller catch
+        up on ranges other writers finished ahead of it.
+        """
+        with self._lock:
+            if self._busy or position != self.offset:
+                self._ahead.append((position, position + len(data)))
+                # Nobody is hashing and this range reaches the digest: take over
+                if self._busy or path is None or not any(s <= self.offset < e for s, e in self._ahead):
+                    return
+                self._busy = True
+                data = None
+            else:
+                self._busy = True
+        if data is None:
+            self._catch_up(path)
+            return
+        self._digest.update(data)
+        with self._lock:
+            self.offset += len(data)
+        self._catch_up(path)
+
+    def resume(self, path, ranges):
+        """
+        Hashes ranges that are already on disk, from the start of the file on.
+        """
+        with self._lock:
+            self._ahead.extend(tuple(r) for r in ranges)
+            if self._busy:
+                return
+            self._busy = True
+        self._catch_up(path)
+
+    def _catch_up(self, path):
+        # Only the thread that set _busy gets here
+        while True:
+            with self._lock:
+                stop = None
+                if path is not None:
+                    for start, end in self._ahead:
+                        if start <= self.offset < end:
+                            stop = end if stop is None else max(stop, end)
+                    if stop is not None:
+                        self._ahead = [(s, e) for s, e in self._ahead if e > stop]
+                if stop is None:
+                    self._ahead = [(s, e) for s, e in self._ahead if e > self.offset]
+                    self._busy = False
+                    return
+                start = self.offset
+            _update_from_file(self._digest, path, start, stop)
+            with self._lock:
+                self.offset = stop
+
+    def finish(self, path, size=None):
+        """
+        Hashes the rest of `path` (up to `size`) and returns the hex digest.
+        """
+        with self._lock:
+            start = self.offset
+            self._ahead = []
+        if size is None or start < size:
+            _update_from_file(self._digest, path, start, size)
+        with self._lock:
+            self.offset = size if size is not None else self.offset
+        return self._digest.hexdigest()
@@ -0,0 +1,436 @@
+import asyncio
+import datetime
+import os
+import threading
+import time
+from core.control import Cancelled, DownloadControl
+from core.downloader import AsyncHttpDownloader, HttpDownloader, get_async_engine
+from core.downloader import YTDownloader
+from core.history import HTTP_FORMAT, get_history, info_key
+from core.integrity import DEFAULT_ALGORITHM, ChecksumMismatch, file_digest, format_hash, parse_hash
+from core.metadata_cache import canonical_key, normalize_url
+from core.postprocess import get_postprocess_pool
+from core.singleflight import get_flights
+from core.stats import TaskStats, get_stats
+from core.types import DownloadTypes
+
+# Minimum seconds between two yt-dlp progress reports of one job
+HOOK_INTERVAL = 0.1
+
+ENGINE_NAMES = {DownloadTypes.YTDLP: 'yt-dlp', DownloadTypes.HTTP: 'http', DownloadTypes.HTTP_ASYNC: 'http-async'}
+
+
+class DownloadJob:
+    """
+    One download, independent of any UI toolkit.
+    Progress goes to report(progress=None, status=None) and the outcome to
+    finished(success, message, digest). DownloadTask wraps it for the Qt app and
+    batch.py drives it directly, so headless runs never import PySide6.
+    stop() and pause() may be called from any thread; either ends run()
+    promptly with finished(False, 'Cancelled' / 'Paused', ''). A cancel deletes
+    partial files, a pause keeps them so running the same job again resumes.
+    Finished files go into the download history; with `skip_existing` a job
+    whose item is already there finishes at once (`skipped` is then True).
+    Each run() is timed in a TaskStats (`stats`) that enters the shared
+    StatsRegistry when it starts; queue wait counts from construction.
+    With `expected_hash` (or `hash_downloads`) the file is hashed and its
+    digest ("sha256:<hex>", or the algorithm of `expected_hash`) passed to
+    finished() and kept in `digest`, otherwise the digest is '' unless the
+    history already knows it; a file that does not match `expected_hash`
+    fails the job and is removed.
+    `handoff`, when set (the scheduler does), is called once a yt-dlp
+    download only has post-processing left, which then waits for the shared
+    PostProcessPool instead of holding a download slot.
+    HTTP_ASYNC jobs download on the shared AsyncHttpEngine; `asynchronous`
+    tells the scheduler to await run_async() there rather than start a thread.
+    Jobs are single-flight per `flight_key` (video or normalised URL, format
+    and folder): one that starts while an identical job is downloading waits
+    for it and finishes with its outcome (`skipped` when that succeeded)
+    rather than fetching the same file a second time. It hands its slot off
+    while waiting and, when it has to download after all, takes one back
+    through `reclaim` (also set by the scheduler).
+    """
+
+    def __init__(self, url, outdir, fmt, downloadTypes: DownloadTypes = DownloadTypes.YTDLP, info=None,
+                 report=None, finished=None, skip_existing=True, expected_hash=None,
+                 hash_downloads=False):
+        self.url = url
+        self.outdir = outdir
+        self.fmt = fmt
+        self.downloadTypes = downloadTypes
+        self.info = info
+        self.report = report or (lambda progress=None, status=None: None)
+        self.finished = finished or (lambda success, message, digest: None)
+        self.skip_existing = skip_existing
+        self.skipped = False
+        self.expected_hash = parse_hash(expected_hash) if expected_hash else None
+        self.hash_downloads = hash_downloads
+        self.digest = None
+        self.handoff = None
+        self.reclaim = None
+        self.control = DownloadControl()
+        self.stats = TaskStats(url, self.engine, fmt)
+        self._partials = set()
+        self._http = None
+        self._outcome = None
+        self._last_hook = 0.0
+
+    @property
+    def stop_requested(self):
+        return self.control.stopped
+
+    def stop(self):
+        self.control.cancel()
+
+    def pause(self):
+        self.control.pause()
+
+    @property
+    def engine(self):
+        return ENGINE_NAMES[self.downloadTypes]
+
+    @property
+    def is_http(self):
+        return self.downloadTypes in (DownloadTypes.HTTP, DownloadTypes.HTTP_ASYNC)
+
+    @property
+    def asynchronous(self):
+        return self.downloadTypes == DownloadTypes.HTTP_ASYNC
+
+    @property
+    def history_format(self):
+        return HTTP_FORMAT if self.is_http else self.fmt
+
+    @property
+    def flight_key(self):
+        key = normalize_url(self.url) if self.is_http else info_key(self.info) or canonical_key(self.url)
+        return 'download', self.history_format, os.path.abspath(self.outdir), key
+
+    def already_downloaded(self):
+        """
+        History record for this item in this format, or None. Needs no network.
+        """
+        history = get_history()
+        fmt = self.history_format
+        record = history.find_url(self.url, fmt)
+        if record is None and self.is_http:
+            record = history.find(self.url, fmt)
+        if record is None and info_key(self.info):
+            record = history.find(info_key(self.info), fmt)
+        if record is None and not self.is_http:
+            # Saved under another spelling of the same video's URL
+            record = history.find(canonical_key(self.url), fmt)
+        return record
+
+    def run(self):
+        if self._begin():
+            return
+        try:
+            flight, leader = get_flights().join(self.flight_key)
+            followed = not leader
+            while not leader:
+                if self._follow(flight):
+                    return
+                flight, leader = get_flights().join(self.flight_key)
+        except Exception as e:
+            self._failed(e)
+            return
+        try:
+            if followed and self.reclaim is not None:
+                self.report(status='Waiting for a download slot')
+                self._wait(self.reclaim())
+            if self.downloadTypes == DownloadTypes.YTDLP:
+                self.download_yt()
+            if self.is_http:
+                self.download_file()
+        except Exception as e:
+            self._failed(e)
+        finally:
+            flight.set_result(self._outcome)
+
+    async def run_async(self):
+        """
+        run() as a coroutine on the AsyncHttpEngine's loop, for HTTP_ASYNC
+        jobs: the scheduler awaits it instead of giving the job a thread.
+        """
+        engine = get_async_engine()
+        if await engine.on_disk(self._begin):
+            return
+        try:
+            flight, leader = get_flights().join(self.flight_key)
+            followed = not leader
+            while not leader:
+                if await self._follow_async(flight):
+                    return
+                flight, leader = get_flights().join(self.flight_key)
+        except Exception as e:
+            self._failed(e)
+            return
+        try:
+            if followed and self.reclaim is not None:
+                self.report(status='Waiting for a download slot')
+                await self._wait_async(self.reclaim())
+            d = await engine.on_disk(self._http_downloader)
+            await d.download_async(progress_callback=lambda p: self.report(progress=p),
+                                   status_callback=lambda s: self.report(status=s), engine=engine)
+            await engine.on_disk(self._http_completed, d)
+        except Exception as e:
+            self._failed(e)
+        finally:
+            flight.set_result(self._outcome)
+
+    def _begin(self):
+        """
+        Starts an attempt; True if it already finished as skipped.
+        """
+        # A paused job may be run again; start from a fresh control
+        if self.control.state == DownloadControl.PAUSED:
+            self.control = DownloadControl()
+        if self.stats.started is not None:
+            self.stats = TaskStats(self.url, self.engine, self.fmt)
+        self._outcome = None
+        get_stats().add(self.stats)
+        self.stats.start()
+        if self.skip_existing:
+            record = self.already_downloaded()
+            if record and self._skip(record):
+                return True
+        return False
+
+    def _finish(self, success, message, digest):
+        self._outcome = (success, message, digest)
+        self.finished(success, message, digest)
+
+    def _follow(self, flight):
+        """
+        Blocks until the identical job in `flight` ends; True once this job
+        finished with its outcome, False if that job was stopped or broke off
+        and this one has to download after all. The scheduler slot is handed
+        off for the wait, so duplicates never hold up other downloads.
+        """
+        self._hand_off_for_follow()
+        self._wait(flight)
+        return self._shared(flight.result())
+
+    async def _follow_async(self, flight):
+        """
+        _follow() for run_async(), waiting on the engine's loop instead of a thread.
+        """
+        self._hand_off_for_follow()
+        await self._wait_async(flight)
+        return self._shared(flight.result())
+
+    def _hand_off_for_follow(self):
+        self.report(status='Waiting for the same download in another item')
+        if self.handoff is not None:
+            self.handoff()
+
+    def _wait(self, future):
+        """
+        Blocks until `future` is done; raises Cancelled if the job is stopped first.
+        """
+        woken = threading.Event()
+        future.add_done_callback(lambda f: woken.set())
+        token = self.control.register(woken.set)
+        try:
+            woken.wait()
+        finally:
+            self.control.unregister(token)
+        self.control.check()
+
+    async def _wait_async(self, future):
+        loop = asyncio.get_running_loop()
+        woken = asyncio.Event()
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(woken.set))
+        token = self.control.register(lambda: loop.call_soon_threadsafe(woken.set))
+        try:
+            await woken.wait()
+        finally:
+            self.control.unregister(token)
+        self.control.check()
+
+    def _shared(self, outcome):
+        if outcome is None or outcome[1] in ('Cancelled', 'Paused'):
+            return False
+        success, message, digest = outcome
+        if not success:
+            self.stats.finish('failed', message)
+            self.report(status=f'Error: {message}')
+            self._finish(False, message, '')
+            return True
+        self.digest = digest or None
+        self.skipped = True
+        self.stats.finish('shared')
+        self.report(progress=100.0, status='Downloaded by another item')
+        self._finish(True, message, digest)
+        return True
+
+    def _failed(self, e):
+        if not self.control.stopped:
+            self.stats.finish('failed', str(e))
+            self.report(status=f'Error: {e}')
+            self._finish(False, str(e), '')
+            return
+        if self.control.state == DownloadControl.CANCELLED:
+            self.discard_partials()
+            self.stats.finish('cancelled')
+            self.report(progress=0.0, status='Cancelled by user')
+            self._finish(False, 'Cancelled', '')
+        else:
+            self.stats.finish('paused')
+            self.report(status='Paused')
+            self._finish(False, 'Paused', '')
+
+    def discard_partials(self):
+        if self._http is not None:
+            self._http.discard_partial()
+        for path in self._partials:
+            for candidate in (path, path + '.ytdl'):
+                try:
+                    os.remove(candidate)
+                except OSError:
+                    pass
+        self._partials.clear()
+
+    @property
+    def hash_algorithm(self):
+        """
+        Algorithm downloads are hashed with, or None when they are not hashed.
+        """
+        if self.expected_hash:
+            return self.expected_hash[0]
+        return DEFAULT_ALGORITHM if self.hash_downloads else None
+
+    def _skip(self, record):
+        """
+        Finishes with the recorded file; False (nothing done) if it does not
+        match `expected_hash`, so it is downloaded again.
+        """
+        path = record['path']
+        algorithm = self.hash_algorithm
+        if algorithm is None or (algorithm == DEFAULT_ALGORITHM and record['sha256']):
+            algorithm, digest = DEFAULT_ALGORITHM, record['sha256']
+        else:
+            digest = file_digest(path, algorithm)
+        if self.expected_hash and digest != self.expected_hash[1]:
+            return False
+        self.digest = format_hash(algorithm, digest) if digest else None
+        self.skipped = True
+        self.stats.finish('skipped')
+        self.report(progress=100.0, status='Already downloaded')
+        self._finish(True, path, self.digest or '')
+        return True
+
+    def download_file(self):
+        d = self._http_downloader()
+        d.download(progress_callback=lambda p: self.report(progress=p),
+                   status_callback=lambda s: self.report(status=s))
+        self._http_completed(d)
+
+    def _http_downloader(self):
+        os.makedirs(self.outdir, exist_ok=True)
+        filename = os.path.join(self.outdir, os.path.basename(self.url))
+        downloader = AsyncHttpDownloader if self.asynchronous else HttpDownloader
+        d = self._http = downloader(self.url, filename=filename, control=self.control, stats=self.stats,
+                                    hash_algorithm=self.hash_algorithm,
+                                    expected_hash=format_hash(*self.expected_hash) if self.expected_hash else None)
+        offset = d.partial_offset()
+        if offset:
+            self.report(status=f'Resuming HTTP download at {offset / 1024 / 1024:.1f} MB')
+        else:
+            self.report(status='Starting HTTP download')
+        return d
+
+    def _http_completed(self, d):
+        sha256 = d.digest if d.hash_algorithm == DEFAULT_ALGORITHM else None
+        get_history().record(self.url, HTTP_FORMAT, d.filename, sha256=sha256, urls=[self.url])
+        self.digest = format_hash(d.hash_algorithm, d.digest) if d.digest else None
+        self.stats.finish('completed')
+        self._finish(True, d.filename, self.digest or '')
+
+    def download_yt(self):
+        ytd = YTDownloader()
+        self.report(status='Starting yt-dlp')
+        archive = get_history().archive(self.fmt) if self.skip_existing else None
+        info = ytd.download(self.url, self.outdir, self.fmt, process_callback=self._progress_hook, info=self.info,
+                            control=self.control, archive=archive,
+                            stats=self.stats, postprocess_callback=self._postprocess_hook, handoff=self._handoff)
+        if info is None:
+            if self.control.stopped:
+                raise Cancelled(self.control.state)
+            # yt-dlp skipped it via the archive before returning any info
+            self._skip_archived(canonical_key(self.url))
+            return
+        self.info = None
+        key = info_key(info)
+        downloads = info.get('requested_downloads') or []
+        path = downloads[0].get('filepath') if downloads else None
+        if path and os.path.exists(path):
+            digest = None
+            if self.hash_algorithm:
+                # yt-dlp / ffmpeg write the merged file themselves, so it is hashed once here
+                digest = file_digest(path, self.hash_algorithm)
+                if self.expected_hash and digest != self.expected_hash[1]:
+                    os.remove(path)
+                    raise ChecksumMismatch(f"{path}: {self.hash_algorithm} {digest} does not match the expected hash")
+                self.digest = format_hash(self.hash_algorithm, digest)
+            if key:
+                sha256 = digest if self.hash_algorithm == DEFAULT_ALGORITHM else None
+                get_history().record(key, self.fmt, path, sha256=sha256, urls=[self.url, info.get('webpage_url')])
+        elif key and not downloads:
+            # yt-dlp skipped it via the archive: the URL was new, the video was not
+            if get_history().find(key, self.fmt):
+                self._skip_archived(key)
+                return
+        self.stats.finish('completed')
+        self.report(status='Done')
+        self._finish(True, info.get('title', ''), self.digest or '')
+
+    def _skip_archived(self, key):
+        """
+        Finishes as 'Already downloaded' with the history record yt-dlp's
+        archive matched, remembering this URL for it.
+        """
+        record = get_history().find(key, self.fmt)
+        if record is None:
+            raise IOError(f"yt-dlp returned no result for {self.url}")
+        get_history().alias(self.url, key)
+        if not self._skip(record):
+            raise ChecksumMismatch(f"{record['path']} is already downloaded but does not match the expected hash")
+
+    def _handoff(self):
+        pool = get_postprocess_pool().stats()
+        if pool['running'] >= pool['workers']:
+            self.report(status=f"Waiting for post-processing ({pool['queued']} ahead)")
+        if self.handoff is not None:
+            self.handoff()
+
+    def _postprocess_hook(self, d):
+        if d.get('status') == 'started':
+            self.report(status=f"Post-processing: {d.get('postprocessor')}...")
+
+    def _progress_hook(self, d):
+        # d is dict with status info
+        if d.get('tmpfilename'):
+            self._partials.add(d['tmpfilename'])
+        if d.get('status') == 'downloading':
+            now = time.monotonic()
+            if now - self._last_hook < HOOK_INTERVAL:
+                return
+            self._last_hook = now
+            total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            downloaded = d.get('downloaded_bytes', 0)
+            eta = d.get('eta')
+            speed = d.get('speed')
+
+            eta_text = f"ETA: {str(datetime.timedelta(seconds=eta))}" if eta is not None else ""
+            speed_text = f"Speed: {round(speed / 1024 / 1024, 2)} MB/s" if speed else ""
+            status = f"{eta_text}  {speed_text}".strip()
+            try:
+                pct = (downloaded / total_bytes) * 100 if total_bytes else 0.0
+            except Exception:
+                pct = 0.0
+            self.report(progress=min(max(pct, 0.0), 100.0), status=status)
+        elif d.get('status') == 'finished':
+            self._last_hook = 0.0
+            self.report(progress=100.0, status='Merging / finalizing...')
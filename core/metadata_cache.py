@@ -0,0 +1,230 @@
+import functools
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from core.config_manager import ROOT, DebouncedWriter
+
+CACHE_PATH = ROOT / "cache" / "metadata.sqlite3"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Fields of the yt-dlp info dict worth keeping for the link list
+INFO_FIELDS = ("id", "title", "extractor_key", "webpage_url", "thumbnail",
+               "duration", "uploader", "channel", "upload_date", "view_count")
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "mc_cid", "mc_eid", "igshid", "_ga"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """
+    The URL with scheme and host lowercased, default port, fragment and
+    tracking parameters dropped and the query sorted, for use as a key:
+    two spellings of the same address normalise to the same string.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in TRACKING_PARAMS and not k.startswith("utm_"))
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_key(url):
+    """
+    "<Extractor>:<video id>" when an extractor recognises the URL, else the
+    normalised URL. Memoised, since matching walks every extractor.
+    """
+    import yt_dlp
+
+    for ie in yt_dlp.extractor.gen_extractor_classes():
+        if ie.ie_key() == "Generic":
+            continue
+        try:
+            if ie.suitable(url):
+                video_id = ie.get_temp_id(url)
+                if video_id:
+                    return f"{ie.ie_key()}:{video_id}"
+                break
+        except Exception:
+            continue
+    return normalize_url(url)
+
+
+def compact_info(info):
+    """
+    The INFO_FIELDS of a yt-dlp info dict: what a list row or the cache keeps.
+    """
+    return {k: info[k] for k in INFO_FIELDS if info and info.get(k) is not None}
+
+
+class RecentInfos:
+    """
+    Small LRU of full yt-dlp info dicts (formats and all, often hundreds of
+    KB each) by video key, so a download started soon after the metadata
+    pass can skip extraction while list rows keep only compact_info().
+    Entries fetched more than `max_age` seconds ago are no use and dropped.
+    """
+
+    def __init__(self, max_items=32, max_age=30 * 60):
+        self.max_items = max_items
+        self.max_age = max_age
+        self._items = OrderedDict()
+
+    def put(self, key, info):
+        self._items.pop(key, None)
+        self._items[key] = info
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def pop(self, key):
+        """
+        Removes and returns the info for `key` if it is still young, else None.
+        """
+        info = self._items.pop(key, None)
+        if info is None or time.time() - info.get("_fetched_at", 0) > self.max_age:
+            return None
+        return info
+
+    def __len__(self):
+        return len(self._items)
+
+
+class MetadataCache:
+    """
+    On-disk cache of title, info fields and thumbnail bytes per video.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the cache grows past `max_bytes`. Hits only note their
+    access time in memory; those are written in one batch by a debounced
+    background writer (or before an eviction), so a hit never waits for a
+    commit on the caller's thread, which is often the GUI's.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                title TEXT,
+                info TEXT,
+                thumbnail BLOB,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS aliases (url TEXT PRIMARY KEY, key TEXT)")
+        self._db.commit()
+        self._accessed = {}
+        self._writer = DebouncedWriter(self.flush_accessed)
+
+    def get(self, key):
+        """
+        Returns (title, info, thumbnail_bytes) or None on a miss / expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT title, info, thumbnail, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            title, info, thumbnail, created = row
+            if now - created > self.ttl:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._accessed[key] = now
+        self._writer.schedule()
+        return title, json.loads(info or "{}"), thumbnail
+
+    def lookup(self, url):
+        """
+        Same as get() but by the exact URL a cached entry was added with,
+        so a hit needs neither extractor matching nor network.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT key FROM aliases WHERE url = ?", (url,)).fetchone()
+        return self.get(row[0]) if row else None
+
+    def alias(self, url, key):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (url, key))
+            self._db.commit()
+
+    def put(self, key, title, info, thumbnail):
+        info_json = json.dumps(compact_info(info))
+        size = len(info_json) + len(title or "") + len(thumbnail or b"")
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, title, info_json, thumbnail, size, now, now)
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def flush_accessed(self):
+        with self._lock:
+            if self._write_accessed():
+                self._db.commit()
+
+    def _write_accessed(self):
+        # Called with the lock held
+        if not self._accessed:
+            return False
+        self._db.executemany("UPDATE entries SET accessed = ? WHERE key = ?",
+                             [(accessed, key) for key, accessed in self._accessed.items()])
+        self._accessed = {}
+        return True
+
+    def _evict(self, now):
+        self._write_accessed()
+        self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._db.execute("DELETE FROM aliases WHERE key NOT IN (SELECT key FROM entries)")
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM aliases")
+            self._db.commit()
+            self._accessed = {}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetadataCache()
+        return _cache
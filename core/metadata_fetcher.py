@@ -1,54 +1,230 @@
+import re
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-import yt_dlp
-import requests
+from core.http_pool import get_pool
+from core.metadata_cache import canonical_key, get_cache, normalize_url
+from core.singleflight import get_flights
+from core.stats import get_stats
 
 class MetadataFetcher:
     """
     Extracts title + thumbnail async, using yt_dlp if available.
+    Results are kept in the on-disk metadata cache; a URL that was added
+    before is answered synchronously from it. Queue wait and extraction time
+    of every yt-dlp call go to the stats registry.
+    Fetches are single-flight: while one for a video runs, asking again for
+    it, by the same URL or any other spelling the extractor maps to the same
+    id, waits for that extraction instead of starting another.
     """
-    _executor = ThreadPoolExecutor(max_workers=4)
+    WORKERS = 4
+    _executor = ThreadPoolExecutor(max_workers=WORKERS)
 
     @staticmethod
-    def fetch_async(url, callback):
+    def fetch_async(url, callback, thumbnail_transform=None):
         """
-        callback(title: str | None, thumbnail_pixmap: QPixmap | None)
+        callback(title: str | None, thumbnail_pixmap: QPixmap | None, info: dict | None)
+        `info` is the full extraction result (or the cached subset of it) and
+        can be passed on to YTDownloader.download to skip a second extraction.
+        thumbnail_transform(bytes) -> bytes runs on the worker before the
+        thumbnail is cached or handed on (e.g. downscaling to list size).
+        Returns True when the callback already ran from the cache.
         """
+        cache = get_cache()
+        hit = cache.lookup(url)
+        if hit:
+            title, info, content = hit
+            callback(title, content, info)
+            return True
+
+        flights = get_flights()
+        normalized = normalize_url(url)
+        flight, leader = flights.join(('metadata', normalized))
+
+        def done(fut):
+            try:
+                title, pix, info = fut.result()
+                callback(title, pix, info)
+            except Exception:
+                callback(None, None, None)
+
+        flight.add_done_callback(done)
+        if not leader:
+            return False
+
+        submitted = time.monotonic()
+        usage = get_stats().pool('metadata', MetadataFetcher.WORKERS)
 
         def task():
+            try:
+                key = canonical_key(url)
+                # Another spelling of this video may already be fetching; join it
+                if key != normalized and not flights.join(('metadata', key), flight)[1]:
+                    flight.add_done_callback(lambda fut: remember(key, fut))
+                    return
+                usage.begin()
+                try:
+                    flight.set_result(fetch(key, time.monotonic() - submitted))
+                finally:
+                    usage.end()
+            except Exception as e:
+                flight.set_exception(e)
+
+        def remember(key, fut):
+            if fut.exception() is None and fut.result()[0]:
+                cache.alias(url, key)
+
+        def fetch(key, queue_wait):
+            hit = cache.get(key)
+            if hit:
+                cache.alias(url, key)
+                title, info, content = hit
+                return title, content, info
+
             title = None
             thumb_url = None
+            info = None
 
             # Try using Python yt_dlp
+            started = time.monotonic()
             try:
+                import yt_dlp
+
                 opts = {"quiet": True, "skip_download": True}
                 with yt_dlp.YoutubeDL(opts) as ydl:
                     info = ydl.extract_info(url, download=False)
+                    info["_fetched_at"] = time.time()
                     title = info.get("title")
                     thumb_url = info.get("thumbnail")
             except Exception:
                 pass
+            get_stats().record_metadata(queue_wait, time.monotonic() - started, info is not None)
 
             # Download thumbnail
             content = None
             if thumb_url:
                 try:
-                    r = requests.get(thumb_url, timeout=8)
+                    r = get_pool().get(thumb_url, timeout=8)
                     if r.status_code == 200:
                         content = r.content
-                        # pix = QPixmap()
-                        # pix.loadFromData(r.content)
+                        if thumbnail_transform:
+                            content = thumbnail_transform(content)
                 except Exception:
                     pass
 
-            return title, content
+            if title:
+                cache.put(key, title, info, content)
+                cache.alias(url, key)
+            return title, content, info
 
-        future = MetadataFetcher._executor.submit(task)
+        MetadataFetcher._executor.submit(task)
+        return False
 
-        def done(fut):
-            try:
-                title, pix = fut.result()
-                callback(title, pix)
-            except Exception:
-                callback(None, None)
 
-        future.add_done_callback(done)
+class PlaylistExpander:
+    """
+    Flat, lazy expansion of playlist / channel URLs on a background thread.
+    Entries are handed to `entries_callback` page by page while yt-dlp walks
+    the continuation pages, so the list fills in as they arrive; stop() ends
+    the walk after the current page.
+    """
+    PAGE_SIZE = 50
+    PLAYLIST_PATTERN = re.compile(
+        r"[?&]list=|/playlist\b|/channel/|/c/|/user/|/@[^/]+/?(videos|shorts|streams|playlists)?/?$"
+        r"|/sets/|/album/|/channels/|/showcase/"
+    )
+
+    def __init__(self, url, entries_callback, finished_callback=None):
+        """
+        entries_callback(entries: list[dict])  each with url, title, id, thumbnail
+        finished_callback(count: int, message: str)
+        """
+        self.url = url
+        self.entries_callback = entries_callback
+        self.finished_callback = finished_callback
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def is_playlist_url(cls, url):
+        return bool(cls.PLAYLIST_PATTERN.search(url))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def _run(self):
+        message = ""
+        try:
+            import yt_dlp
+
+            opts = {"quiet": True, "skip_download": True, "extract_flat": "in_playlist", "lazy_playlist": True}
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                result = self._resolve(ydl, ydl.extract_info(self.url, download=False, process=False))
+                page = []
+                for entry in self._walk(result):
+                    page.append(entry)
+                    if len(page) >= self.PAGE_SIZE:
+                        self._flush(page)
+                        page = []
+                    if self.stopped:
+                        break
+                self._flush(page)
+            if self.stopped:
+                message = "Stopped"
+        except Exception as e:
+            message = f"Error: {e}"
+        if self.finished_callback:
+            self.finished_callback(self.count, message)
+
+    def _resolve(self, ydl, result, hops=5):
+        """
+        With process=False yt-dlp hands back redirects (e.g. a watch URL with
+        a list= parameter points at the tab extractor) instead of following
+        them; follow those here so the playlist itself gets walked.
+        """
+        while result and result.get("_type") in ("url", "url_transparent") and hops > 0 and not self.stopped:
+            resolved = ydl.extract_info(result["url"], ie_key=result.get("ie_key"), download=False, process=False)
+            if not resolved:
+                break
+            result = resolved
+            hops -= 1
+        return result
+
+    def _walk(self, result, depth=0):
+        if result.get("_type") not in ("playlist", "multi_video"):
+            yield self._entry(result)
+            return
+        for entry in result.get("entries") or []:
+            if self.stopped:
+                return
+            if not entry:
+                continue
+            if entry.get("_type") in ("playlist", "multi_video") and depth < 2:
+                yield from self._walk(entry, depth + 1)
+            else:
+                yield self._entry(entry)
+
+    def _entry(self, entry):
+        thumbnail = entry.get("thumbnail")
+        if not thumbnail and entry.get("thumbnails"):
+            thumbnail = entry["thumbnails"][-1].get("url")
+        return {
+            "url": entry.get("webpage_url") or entry.get("url") or self.url,
+            "title": entry.get("title"),
+            "id": entry.get("id"),
+            "thumbnail": thumbnail,
+        }
+
+    def _flush(self, page):
+        if page:
+            self.count += len(page)
+            self.entries_callback(page)
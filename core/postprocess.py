@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+from core.stats import get_stats
+
+# How often a job waiting for a worker checks whether it was cancelled
+WAIT_POLL = 0.2
+
+
+def default_workers():
+    """
+    One ffmpeg per core, leaving a core for the UI and the network threads
+    on machines that have more than two.
+    """
+    cores = os.cpu_count() or 1
+    return cores - 1 if cores > 2 else cores
+
+
+class PostProcessPool:
+    """
+    Bounded stage for CPU-heavy post-processing (ffmpeg merges, audio
+    extraction). A download hands its finished files over by calling
+    acquire() when yt-dlp starts post-processing; at most `workers` jobs
+    then run ffmpeg at once and the rest wait in FIFO order. The waiting is
+    done by the download's own thread, but the scheduler has already been
+    told to free its network slot, so the next download starts meanwhile.
+    Busy time is accounted in the stats registry as 'postprocess'.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = max(1, workers or default_workers())
+        self.running = 0
+        self._waiting = []
+        self._cond = threading.Condition()
+        self.usage = get_stats().pool('postprocess', self.workers)
+
+    def set_workers(self, workers):
+        with self._cond:
+            self.workers = max(1, workers or default_workers())
+            self.usage.set_capacity(self.workers)
+            self._cond.notify_all()
+
+    def acquire(self, control=None):
+        """
+        Blocks until a worker is free and returns the seconds waited, or None
+        if `control` was stopped first.
+        """
+        started = time.monotonic()
+        ticket = object()
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while self.running >= self.workers or self._waiting[0] is not ticket:
+                    if control is not None and control.stopped:
+                        return None
+                    self._cond.wait(WAIT_POLL)
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+            self.running += 1
+        self.usage.begin()
+        return time.monotonic() - started
+
+    def release(self):
+        with self._cond:
+            self.running = max(0, self.running - 1)
+            self._cond.notify_all()
+        self.usage.end()
+
+    def stats(self):
+        with self._cond:
+            return {'workers': self.workers, 'running': self.running, 'queued': len(self._waiting)}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_postprocess_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PostProcessPool()
+        return _pool
@@ -0,0 +1,51 @@
+import threading
+
+
+class ProgressTable:
+    """
+    Shared progress state between download workers and the UI.
+    Workers overwrite their row as often as they like (a dict write under a
+    short lock); the UI drains only the rows that changed, once per frame,
+    instead of receiving a queued signal for every chunk.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def update(self, key, progress=None, status=None):
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = [0.0, '']
+            if progress is not None:
+                row[0] = progress
+            if status is not None:
+                row[1] = status
+            self._dirty.add(key)
+
+    def get(self, key):
+        with self._lock:
+            row = self._rows.get(key)
+            return tuple(row) if row else None
+
+    def remove(self, key):
+        with self._lock:
+            self._rows.pop(key, None)
+            self._dirty.discard(key)
+
+    def snapshot(self):
+        """
+        Returns {key: (progress, status)} for rows changed since the last call.
+        """
+        with self._lock:
+            if not self._dirty:
+                return {}
+            changed = {key: tuple(self._rows[key]) for key in self._dirty}
+            self._dirty.clear()
+        return changed
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
@@ -0,0 +1,233 @@
+import json
+import os
+import shutil
+import stat
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.config_manager import BIN_PATH, ROOT, SYSTEM
+from core.integrity import format_hash
+
+CACHE_PATH = ROOT / "binaries.json"
+DEPENDENCIES = ("ffmpeg", "ffprobe")
+BASE_URL = "https://github.com/imageio/imageio-binaries/raw/183aef992339cc5a463528c75dd298db15fd346f/ffmpeg/"
+
+# Pinned builds from one immutable imageio-binaries commit. A build is only
+# installed when its download matches `sha256`; one whose digest has not been
+# recorded yet (None) is never downloaded, so ffmpeg has to come from PATH or
+# the bin directory instead. Record a digest as the sha256sum of BASE_URL + exe.
+BINARIES = {
+    "Linux": {
+        "ffmpeg": {"exe": "ffmpeg-linux64-v4.1", "sha256": None},
+        "ffprobe": {"exe": "ffprobe-linux64-v4.1", "sha256": None},
+    },
+    "Darwin": {
+        "ffmpeg": {"exe": "ffmpeg-osx64-v4.1", "sha256": None},
+        "ffprobe": {"exe": "ffprobe-osx64-v4.1", "sha256": None},
+    },
+    "Windows": {
+        "ffmpeg": {"exe": "ffmpeg-win64-v4.1.exe", "sha256": None},
+        "ffprobe": {"exe": "ffprobe-win64-v4.1.exe", "sha256": None},
+    },
+}
+
+
+class UnpinnedBinary(IOError):
+    pass
+
+
+def bundled_path(name):
+    return Path(BIN_PATH) / (name + ".exe" if SYSTEM == "Windows" else name)
+
+
+def probe_binary(path, timeout=10):
+    """
+    Runs `<path> -version`. Returns {'path', 'version', 'seconds'} or None if unusable.
+    """
+    start = time.perf_counter()
+    try:
+        result = subprocess.run([str(path), "-version"], capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    first_line = (result.stdout.splitlines() or [""])[0]
+    parts = first_line.split()
+    version = parts[2] if len(parts) > 2 and parts[1] == "version" else first_line
+    return {"path": str(path), "version": version, "seconds": round(time.perf_counter() - start, 4)}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_size, int(st.st_mtime)
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    os.makedirs(ROOT, exist_ok=True)
+    tmp = str(CACHE_PATH) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=1)
+    os.replace(tmp, CACHE_PATH)
+
+
+def _cached_entry_valid(entry):
+    try:
+        return [entry["size"], entry["mtime"]] == list(_stat_key(entry["path"]))
+    except (KeyError, OSError):
+        return False
+
+
+def find_system_binary(name):
+    """
+    Best working candidate among PATH and the bundled bin directory.
+    PATH wins on a tie; among working candidates the fastest to start is used.
+    """
+    candidates = []
+    seen = set()
+    for path in (shutil.which(name), bundled_path(name)):
+        if not path or not os.path.exists(path):
+            continue
+        real = os.path.realpath(path)
+        if real in seen:
+            continue
+        seen.add(real)
+        probed = probe_binary(path)
+        if probed:
+            candidates.append(probed)
+    if not candidates:
+        return None
+    return min(candidates, key=lambda c: c["seconds"])
+
+
+def download_binary(name, url, target, expected_sha256):
+    """
+    Downloads `url` next to `target` with HttpDownloader, which verifies it
+    against `expected_sha256` while streaming (ChecksumMismatch otherwise),
+    then marks it executable and renames it into place atomically.
+    Returns the hex digest.
+    """
+    from core.downloader import HttpDownloader
+
+    if not expected_sha256:
+        raise UnpinnedBinary(f"{name}: no pinned sha256 for {url}; not installing an unverified binary")
+    print(f"Downloading missing binary: {name} from {url}")
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.download")
+    d = HttpDownloader(url, filename=str(tmp), expected_hash=format_hash("sha256", expected_sha256))
+    d.download()
+    mode = os.stat(tmp).st_mode
+    os.chmod(tmp, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(tmp, target)
+    return d.digest
+
+
+_resolved = None
+_resolved_lock = threading.Lock()
+
+
+def resolve_binaries(status_callback=None):
+    """
+    Returns {'ffmpeg': path, 'ffprobe': path}, provisioning what is missing.
+
+    1. paths cached from an earlier launch (unchanged size/mtime) are used as is;
+    2. otherwise working binaries on PATH or in the bin directory are probed;
+    3. anything still missing is downloaded in parallel, checked against the
+       pinned SHA-256 in BINARIES while streaming and installed atomically;
+       a build without a pinned digest is refused (UnpinnedBinary).
+    """
+    global _resolved
+    with _resolved_lock:
+        if _resolved:
+            return dict(_resolved)
+
+        cache = load_cache()
+        resolved = {}
+        for name in DEPENDENCIES:
+            entry = cache.get(name)
+            if entry and _cached_entry_valid(entry):
+                resolved[name] = entry["path"]
+
+        missing = [name for name in DEPENDENCIES if name not in resolved]
+        for name in missing:
+            if status_callback:
+                status_callback(f"Looking for {name}...")
+            found = find_system_binary(name)
+            if found:
+                print(f"Using {name} {found['version']} at {found['path']}")
+                resolved[name] = found["path"]
+                size, mtime = _stat_key(found["path"])
+                cache[name] = {**cache.get(name, {}), **found, "size": size, "mtime": mtime}
+
+        missing = [name for name in DEPENDENCIES if name not in resolved]
+        # Keep what was found even if a download below fails
+        save_cache(cache)
+        if missing:
+            if status_callback:
+                status_callback(f"Downloading {', '.join(missing)}...")
+            table = BINARIES[SYSTEM]
+
+            def fetch(name):
+                url = BASE_URL + table[name]["exe"]
+                target = bundled_path(name)
+                return name, str(target), download_binary(name, url, target, table[name]["sha256"])
+
+            error = None
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                for future in [pool.submit(fetch, name) for name in missing]:
+                    try:
+                        name, path, sha256 = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    print(f"Downloaded {name} to {path}")
+                    size, mtime = _stat_key(path)
+                    cache[name] = {"path": path, "sha256": sha256, "size": size, "mtime": mtime}
+                    resolved[name] = path
+            if error is not None:
+                # An installed binary is kept for the next attempt
+                save_cache(cache)
+                raise error
+
+        save_cache(cache)
+        apply_environment(resolved)
+        _resolved = resolved
+        return dict(resolved)
+
+
+def apply_environment(resolved):
+    if resolved.get("ffmpeg"):
+        os.environ["FFMPEG"] = resolved["ffmpeg"]
+    if resolved.get("ffprobe"):
+        os.environ["FFPROBE"] = resolved["ffprobe"]
+
+
+def ffmpeg_location():
+    """
+    Value for yt-dlp's `ffmpeg_location`: the directory holding both tools
+    when they sit together, else the ffmpeg binary itself; None to let yt-dlp
+    search PATH.
+    """
+    resolved = _resolved
+    if resolved is None:
+        cache = load_cache()
+        resolved = {name: cache[name]["path"] for name in DEPENDENCIES
+                    if name in cache and _cached_entry_valid(cache[name])}
+    ffmpeg = resolved.get("ffmpeg")
+    if not ffmpeg:
+        return None
+    ffprobe = resolved.get("ffprobe")
+    if ffprobe and os.path.dirname(ffprobe) == os.path.dirname(ffmpeg):
+        return os.path.dirname(ffmpeg)
+    return ffmpeg
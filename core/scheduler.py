@@ -0,0 +1,263 @@
+import bisect
+import itertools
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+from core.stats import get_stats
+
+
+def host_key(url):
+    """
+    Host used for per-host limits; www. / m. mirrors count as the same host.
+    """
+    host = (urlsplit(url).hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if host == 'youtu.be':
+        host = 'youtube.com'
+    return host
+
+
+class Job:
+    __slots__ = ('task', 'url', 'host', 'priority', 'seq', 'state', 'resumed')
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    # Still running, but its slot was handed to the next job
+    HANDED_OFF = 'handed_off'
+    DONE = 'done'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, task, url, priority, seq):
+        self.task = task
+        self.url = url
+        self.host = host_key(url)
+        self.priority = priority
+        self.seq = seq
+        self.state = Job.QUEUED
+        self.resumed = None
+
+    def sort_key(self):
+        # Higher priority first, then FIFO
+        return (-self.priority, self.seq)
+
+
+class DownloadScheduler:
+    """
+    Owns the download queue and runs tasks (anything with a run() method) on
+    its own threads, so a long batch never floods QThreadPool.globalInstance().
+    At most `max_concurrent` tasks run at once and at most `per_host` per host
+    (overridable per host via `host_limits`). Waiting jobs start by priority,
+    first-come first-served within a priority; a host at its limit does not
+    block jobs for other hosts behind it.
+    Busy time is accounted in the stats registry under `name`.
+    A task with a `handoff` attribute gets a callable there that frees its
+    slot early, e.g. once its download is done and only post-processing is
+    left; wait() still waits for it to finish. One with a `reclaim` attribute
+    gets a callable there that queues it for a slot again and returns a
+    Future set once it holds one.
+    Tasks whose `asynchronous` attribute is true provide run_async() instead,
+    which is awaited on the AsyncHttpEngine's loop rather than given a thread.
+    """
+
+    def __init__(self, max_concurrent=3, per_host=2, host_limits=None, name='downloads'):
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_host = max(1, per_host)
+        self.host_limits = dict(host_limits or {})
+        self.paused = False
+        self._queue = []
+        self._keys = []
+        self._running = {}
+        self._handed_off = {}
+        self._host_running = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.usage = get_stats().pool(name, self.max_concurrent)
+
+    def submit(self, task, url, priority=0):
+        with self._lock:
+            job = Job(task, url, priority, next(self._seq))
+            self._insert(job)
+            self._dispatch()
+        return job
+
+    def cancel(self, job):
+        """
+        Drops a job that has not started yet. Returns False if it already runs.
+        """
+        with self._lock:
+            if job.state != Job.QUEUED:
+                return False
+            self._remove(job)
+            job.state = Job.CANCELLED
+            self._idle.notify_all()
+            return True
+
+    def set_priority(self, job, priority):
+        with self._lock:
+            if job.state != Job.QUEUED:
+                return
+            self._remove(job)
+            job.priority = priority
+            self._insert(job)
+            self._dispatch()
+
+    def move_to_front(self, job):
+        with self._lock:
+            top = self._queue[0].priority if self._queue else job.priority
+        self.set_priority(job, max(top, job.priority) + 1)
+
+    def pause(self):
+        with self._lock:
+            self.paused = True
+
+    def resume(self):
+        with self._lock:
+            self.paused = False
+            self._dispatch()
+
+    def set_limits(self, max_concurrent=None, per_host=None, host_limits=None):
+        with self._lock:
+            if max_concurrent:
+                self.max_concurrent = max(1, max_concurrent)
+                self.usage.set_capacity(self.max_concurrent)
+            if per_host:
+                self.per_host = max(1, per_host)
+            if host_limits:
+                self.host_limits.update(host_limits)
+            self._dispatch()
+
+    def position(self, job):
+        with self._lock:
+            if job.state != Job.QUEUED:
+                return -1
+            return bisect.bisect_left(self._keys, job.sort_key())
+
+    def stats(self):
+        with self._lock:
+            return {'queued': len(self._queue), 'running': len(self._running),
+                    'handed_off': len(self._handed_off), 'paused': self.paused}
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the queue is empty and nothing is running.
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._queue and not self._running and not self._handed_off,
+                                       timeout)
+
+    def handoff(self, job):
+        """
+        Frees the slot of a running job that keeps running without it.
+        """
+        with self._lock:
+            if self._release(job):
+                job.state = Job.HANDED_OFF
+                self._handed_off[job.seq] = job
+
+    def reclaim(self, job):
+        """
+        Queues a handed-off job for a slot again, ahead of jobs submitted
+        after it; the returned Future is set once it holds one.
+        """
+        future = Future()
+        with self._lock:
+            if job.seq not in self._handed_off or self._queued(job):
+                future.set_result(None)
+                return future
+            job.resumed = future
+            self._insert(job)
+            self._dispatch()
+        return future
+
+    def _insert(self, job):
+        key = job.sort_key()
+        i = bisect.bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._queue.insert(i, job)
+
+    def _remove(self, job):
+        i = bisect.bisect_left(self._keys, job.sort_key())
+        del self._keys[i]
+        del self._queue[i]
+
+    def _queued(self, job):
+        i = bisect.bisect_left(self._keys, job.sort_key())
+        return i < len(self._queue) and self._queue[i] is job
+
+    def _host_limit(self, host):
+        return self.host_limits.get(host, self.per_host)
+
+    def _dispatch(self):
+        # Called with the lock held
+        if self.paused:
+            return
+        i = 0
+        while i < len(self._queue) and len(self._running) < self.max_concurrent:
+            job = self._queue[i]
+            if self._host_running.get(job.host, 0) >= self._host_limit(job.host):
+                i += 1
+                continue
+            del self._keys[i]
+            del self._queue[i]
+            self._start(job)
+
+    def _start(self, job):
+        job.state = Job.RUNNING
+        self._running[job.seq] = job
+        self._host_running[job.host] = self._host_running.get(job.host, 0) + 1
+        self.usage.begin()
+        if self._handed_off.pop(job.seq, None) is not None:
+            # A reclaimed job: it never stopped running, it only gets its slot back
+            job.resumed.set_result(None)
+            return
+        if getattr(job.task, 'asynchronous', False):
+            from core.downloader import get_async_engine
+
+            get_async_engine().submit(self._run_async(job))
+            return
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _release(self, job):
+        # Called with the lock held
+        if self._running.pop(job.seq, None) is None:
+            return False
+        self._host_running[job.host] -= 1
+        self.usage.end()
+        self._dispatch()
+        return True
+
+    def _bind(self, job):
+        if hasattr(job.task, 'handoff'):
+            job.task.handoff = lambda: self.handoff(job)
+        if hasattr(job.task, 'reclaim'):
+            job.task.reclaim = lambda: self.reclaim(job)
+
+    def _run(self, job):
+        self._bind(job)
+        try:
+            job.task.run()
+        except Exception as e:
+            print(f"Scheduled task for {job.url} failed: {e}")
+        finally:
+            self._done(job)
+
+    async def _run_async(self, job):
+        self._bind(job)
+        try:
+            await job.task.run_async()
+        except Exception as e:
+            print(f"Scheduled task for {job.url} failed: {e}")
+        finally:
+            self._done(job)
+
+    def _done(self, job):
+        with self._lock:
+            if job.seq in self._handed_off and self._queued(job):
+                self._remove(job)
+            job.state = Job.DONE
+            self._release(job)
+            self._handed_off.pop(job.seq, None)
+            self._idle.notify_all()
@@ -4,4 +4,9 @@ from PySide6.QtCore import QObject, Signal
 class DownloadWorkerSignals(QObject):
     progress = Signal(float)  # percent 0..100
     status = Signal(str)
-    finished = Signal(bool, str)  # success, message
+    finished = Signal(bool, str, str)  # success, message, digest ('' when there is none)
+
+
+class PlaylistSignals(QObject):
+    entries = Signal(list)  # list of entry dicts
+    finished = Signal(int, str)  # entries added, message
@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Registry of work in progress by key. The first caller to join() a key
+    becomes its leader and must complete the returned Future; whoever joins
+    the same key before that gets the same Future and shares its result.
+    A Future may be registered under several keys (e.g. a normalised URL
+    and, once known, the extractor's video key); it leaves the registry as
+    soon as it completes, so later callers start afresh.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key, future=None):
+        """
+        Returns (future, leader). When `key` is already in flight and a
+        `future` is given, that one is completed with the same outcome.
+        """
+        with self._lock:
+            current = self._flights.get(key)
+            if current is None:
+                current = self._flights[key] = future or Future()
+                leader = True
+            else:
+                leader = False
+        if leader:
+            current.add_done_callback(lambda f: self._forget(key, f))
+        elif future is not None:
+            current.add_done_callback(lambda f: _forward(f, future))
+        return current, leader
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+
+def _forward(source, target):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+_flights = None
+_flights_lock = threading.Lock()
+
+
+def get_flights():
+    global _flights
+    with _flights_lock:
+        if _flights is None:
+            _flights = SingleFlight()
+        return _flights
@@ -0,0 +1,334 @@
+import csv
+import io
+import json
+import threading
+import time
+from collections import deque
+
+from core.config_manager import atomic_write
+
+# Finished tasks kept for the stats panel and exports; older ones are dropped
+MAX_TASKS = 2000
+# Window over which peak throughput is measured
+PEAK_WINDOW = 1.0
+
+CSV_FIELDS = ['url', 'engine', 'format', 'outcome', 'error', 'queued_at', 'queue_wait_s', 'extract_s', 'ttfb_s',
+              'download_s', 'bytes', 'sustained_bps', 'peak_bps', 'retries', 'postprocess_wait_s', 'postprocess_s',
+              'postprocess_stages', 'total_s']
+
+
+class TaskStats:
+    """
+    Timings of one download attempt. The job marks the phases, the engines
+    feed bytes, retries and post-processing stages; everything else is
+    derived in as_dict(). Bytes may come from several segment threads, but
+    the engines already serialise those calls.
+    """
+
+    def __init__(self, url, engine, fmt=None):
+        self.url = url
+        self.engine = engine
+        self.format = fmt
+        self.queued_at = time.time()
+        self.queued = time.monotonic()
+        self.started = None
+        self.extracted = None
+        self.first_byte = None
+        self.last_byte = None
+        self.ended = None
+        self.bytes = 0
+        self.retries = 0
+        self.peak_bps = 0.0
+        self.stages = {}
+        self.postprocess_wait = None
+        self.outcome = 'queued'
+        self.error = None
+        self._window_start = None
+        self._window_bytes = 0
+        self._stage_started = {}
+
+    def start(self):
+        if self.started is None:
+            self.started = time.monotonic()
+        self.outcome = 'running'
+
+    def extraction_done(self):
+        if self.extracted is None:
+            self.extracted = time.monotonic()
+
+    def add_bytes(self, n):
+        if n <= 0:
+            return
+        now = time.monotonic()
+        if self.first_byte is None:
+            self.first_byte = self._window_start = now
+        self.last_byte = now
+        self.bytes += n
+        self._window_bytes += n
+        elapsed = now - self._window_start
+        if elapsed >= PEAK_WINDOW:
+            self.peak_bps = max(self.peak_bps, self._window_bytes / elapsed)
+            self._window_start = now
+            self._window_bytes = 0
+
+    def retry(self):
+        self.retries += 1
+
+    def postprocess_queued(self, seconds):
+        self.postprocess_wait = (self.postprocess_wait or 0.0) + seconds
+
+    def stage(self, name, status):
+        """
+        Post-processor hook statuses ('started' / 'finished') per stage name.
+        """
+        now = time.monotonic()
+        if status == 'started':
+            self._stage_started[name] = now
+        elif status == 'finished' and name in self._stage_started:
+            self.stages[name] = self.stages.get(name, 0.0) + now - self._stage_started.pop(name)
+
+    def finish(self, outcome, error=None):
+        self.ended = time.monotonic()
+        self.outcome = outcome
+        self.error = error
+
+    def as_dict(self):
+        def span(start, end):
+            return round(end - start, 3) if start is not None and end is not None else None
+
+        now = self.ended or time.monotonic()
+        download_s = span(self.first_byte, self.last_byte)
+        sustained = self.bytes / download_s if download_s else None
+        peak = self.peak_bps or sustained
+        return {
+            'url': self.url,
+            'engine': self.engine,
+            'format': self.format,
+            'outcome': self.outcome,
+            'error': self.error,
+            'queued_at': round(self.queued_at, 3),
+            'queue_wait_s': span(self.queued, self.started if self.started is not None else now),
+            'extract_s': span(self.started, self.extracted),
+            # From the end of extraction (or the start, when there is none) to the first byte
+            'ttfb_s': span(self.extracted if self.extracted is not None else self.started, self.first_byte),
+            'download_s': download_s,
+            'bytes': self.bytes,
+            'sustained_bps': round(sustained) if sustained else None,
+            'peak_bps': round(peak) if peak else None,
+            'retries': self.retries,
+            'postprocess_wait_s': round(self.postprocess_wait, 3) if self.postprocess_wait is not None else None,
+            'postprocess_s': round(sum(self.stages.values()), 3) if self.stages else None,
+            'postprocess_stages': {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            'total_s': span(self.queued, now),
+        }
+
+
+class PoolUsage:
+    """
+    Busy/capacity accounting for one worker pool: how many workers are busy
+    now and at peak, and busy worker-seconds over capacity-seconds since the
+    pool was created (or reset), i.e. its utilisation.
+    """
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity
+        self.busy = 0
+        self.peak = 0
+        self.tasks = 0
+        self._busy_seconds = 0.0
+        self._capacity_seconds = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _advance(self):
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._busy_seconds += self.busy * elapsed
+        self._capacity_seconds += self.capacity * elapsed
+        self._last = now
+
+    def set_capacity(self, capacity):
+        with self._lock:
+            self._advance()
+            self.capacity = capacity
+
+    def begin(self):
+        with self._lock:
+            self._advance()
+            self.busy += 1
+            self.tasks += 1
+            self.peak = max(self.peak, self.busy)
+
+    def end(self):
+        with self._lock:
+            self._advance()
+            self.busy = max(0, self.busy - 1)
+
+    def reset(self):
+        with self._lock:
+            self._advance()
+            self._busy_seconds = self._capacity_seconds = 0.0
+            self.peak = self.busy
+            self.tasks = 0
+
+    def snapshot(self):
+        with self._lock:
+            self._advance()
+            return {
+                'capacity': self.capacity,
+                'busy': self.busy,
+                'peak': self.peak,
+                'tasks': self.tasks,
+                'utilization': round(self._busy_seconds / self._capacity_seconds, 4)
+                if self._capacity_seconds else 0.0,
+            }
+
+
+class StatsRegistry:
+    """
+    Process-wide performance record: the last MAX_TASKS download attempts,
+    metadata extraction timings and the usage of each worker pool.
+    snapshot() is what the stats panel shows; export() writes it as JSON
+    (everything) or CSV (one row per task).
+    """
+
+    def __init__(self, max_tasks=MAX_TASKS):
+        self._tasks = deque(maxlen=max_tasks)
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._reset_metadata()
+
+    def _reset_metadata(self):
+        self._metadata = {'count': 0, 'failed': 0, 'queue_wait_s': 0.0, 'extract_s': 0.0, 'max_extract_s': 0.0}
+
+    def add(self, stats):
+        with self._lock:
+            self._tasks.append(stats)
+        return stats
+
+    def pool(self, name, capacity):
+        with self._lock:
+            usage = self._pools.get(name)
+            if usage is None:
+                usage = self._pools[name] = PoolUsage(name, capacity)
+        if usage.capacity != capacity:
+            usage.set_capacity(capacity)
+        return usage
+
+    def record_metadata(self, queue_wait, extract_seconds, ok):
+        with self._lock:
+            m = self._metadata
+            m['count'] += 1
+            m['failed'] += 0 if ok else 1
+            m['queue_wait_s'] += queue_wait
+            m['extract_s'] += extract_seconds
+            m['max_extract_s'] = max(m['max_extract_s'], extract_seconds)
+
+    def reset(self):
+        with self._lock:
+            self._tasks.clear()
+            self._reset_metadata()
+            pools = list(self._pools.values())
+        for usage in pools:
+            usage.reset()
+
+    def tasks(self):
+        with self._lock:
+            tasks = list(self._tasks)
+        return [t.as_dict() for t in tasks]
+
+    def snapshot(self):
+        from core.http_pool import get_pool
+
+        tasks = self.tasks()
+        with self._lock:
+            m = dict(self._metadata)
+            pools = list(self._pools.values())
+        count = m.pop('count')
+        metadata = {
+            'count': count,
+            'failed': m['failed'],
+            'avg_queue_wait_s': round(m['queue_wait_s'] / count, 3) if count else None,
+            'avg_extract_s': round(m['extract_s'] / count, 3) if count else None,
+            'max_extract_s': round(m['max_extract_s'], 3),
+        }
+        return {
+            'time': round(time.time(), 3),
+            'summary': summarize(tasks),
+            'metadata': metadata,
+            'pools': {usage.name: usage.snapshot() for usage in pools},
+            'connections': get_pool().stats(),
+            'tasks': tasks,
+        }
+
+    def export(self, path):
+        """
+        Writes the snapshot to `path`: CSV when it ends in .csv, else JSON.
+        """
+        if str(path).lower().endswith('.csv'):
+            atomic_write(path, tasks_csv(self.tasks()))
+        else:
+            atomic_write(path, json.dumps(self.snapshot(), indent=1))
+
+
+def summarize(tasks):
+    """
+    Totals over task dicts: outcomes, bytes and where the time went.
+    """
+    outcomes = {}
+    for t in tasks:
+        outcomes[t['outcome']] = outcomes.get(t['outcome'], 0) + 1
+    phases = {}
+    for phase in ('queue_wait_s', 'extract_s', 'ttfb_s', 'download_s', 'postprocess_wait_s', 'postprocess_s'):
+        values = [t[phase] for t in tasks if t[phase] is not None]
+        phases[phase] = {'total': round(sum(values), 3), 'max': round(max(values), 3) if values else None}
+    download_s = phases['download_s']['total']
+    total_bytes = sum(t['bytes'] for t in tasks)
+    return {
+        'tasks': len(tasks),
+        'outcomes': outcomes,
+        'bytes': total_bytes,
+        'retries': sum(t['retries'] for t in tasks),
+        'avg_sustained_bps': round(total_bytes / download_s) if download_s else None,
+        'peak_bps': max((t['peak_bps'] or 0 for t in tasks), default=0) or None,
+        'phases': phases,
+        'postprocess_stages': stage_totals(tasks),
+    }
+
+
+def stage_totals(tasks):
+    """
+    Per post-processor: how many tasks ran it, total and average seconds.
+    """
+    totals = {}
+    for t in tasks:
+        for name, seconds in t['postprocess_stages'].items():
+            entry = totals.setdefault(name, {'count': 0, 'total': 0.0})
+            entry['count'] += 1
+            entry['total'] += seconds
+    return {name: {'count': e['count'], 'total': round(e['total'], 3), 'avg': round(e['total'] / e['count'], 3)}
+            for name, e in sorted(totals.items())}
+
+
+def tasks_csv(tasks):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for t in tasks:
+        row = dict(t)
+        row['postprocess_stages'] = ';'.join(f'{name}={s}' for name, s in t['postprocess_stages'].items())
+        writer.writerow(row)
+    return out.getvalue()
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_stats():
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = StatsRegistry()
+        return _stats
@@ -2,4 +2,4 @@
 import enum
 
 
-DownloadTypes = enum.Enum('DownloadTypes', 'HTTP YTDLP')
\ No newline at end of file
+DownloadTypes = enum.Enum('DownloadTypes', 'HTTP YTDLP HTTP_ASYNC')
\ No newline at end of file
@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from core.metadata_fetcher import PlaylistExpander
+
+
+class FakeYoutubeDL:
+    """
+    Answers extract_info the way yt-dlp does with process=False for a
+    youtu.be/<id>?list=<id> link: a url result pointing at the tab
+    extractor, which then returns the flat playlist.
+    """
+    calls = []
+
+    def __init__(self, opts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=True, ie_key=None, process=True):
+        self.calls.append((url, ie_key))
+        if "youtu.be" in url:
+            return {"_type": "url", "url": "https://www.youtube.com/playlist?list=PL1", "ie_key": "YoutubeTab"}
+        return {
+            "_type": "playlist",
+            "id": "PL1",
+            "entries": iter([
+                {"_type": "url", "url": "https://www.youtube.com/watch?v=a", "id": "a", "title": "A"},
+                {"_type": "url", "url": "https://www.youtube.com/watch?v=b", "id": "b", "title": "B"},
+            ]),
+        }
+
+
+class PlaylistExpanderTest(unittest.TestCase):
+    def test_follows_url_result_to_playlist(self):
+        FakeYoutubeDL.calls = []
+        pages, finished = [], []
+        expander = PlaylistExpander(
+            "https://youtu.be/x?list=PL1", pages.extend, lambda count, message: finished.append((count, message))
+        )
+        with mock.patch("yt_dlp.YoutubeDL", FakeYoutubeDL):
+            expander._run()
+        self.assertEqual([e["id"] for e in pages], ["a", "b"])
+        self.assertEqual(finished, [(2, "")])
+        self.assertEqual(FakeYoutubeDL.calls[1], ("https://www.youtube.com/playlist?list=PL1", "YoutubeTab"))
+
+
+if __name__ == "__main__":
+    unittest.main()
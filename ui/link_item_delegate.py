@@ -0,0 +1,102 @@
+from PySide6.QtCore import Qt, QEvent, QRect, QSize, Signal
+from PySide6.QtGui import QFontMetrics
+from PySide6.QtWidgets import (
+    QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton, QStyleOptionProgressBar
+)
+
+from ui.link_list_model import RowRole
+from ui.thumbnails import THUMB_HEIGHT, THUMB_WIDTH
+
+MARGIN = 6
+SPACING = 8
+BUTTON_WIDTH = 96
+BUTTON_HEIGHT = 30
+PROGRESS_HEIGHT = 14
+
+
+class LinkItemDelegate(QStyledItemDelegate):
+    """
+    Paints a link row (thumbnail, title, status, progress and a
+    Download / Stop / Resume button) straight from its LinkRow, so rows cost
+    nothing until they are on screen.
+    """
+    button_clicked = Signal(object)  # LinkRow
+    thumbnail_missing = Signal(object)  # LinkRow whose pixmap was evicted
+
+    def __init__(self, thumbnails, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self._placeholder = None
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), THUMB_HEIGHT + 2 * MARGIN + 8)
+
+    def _layout(self, rect):
+        inner = rect.adjusted(MARGIN, MARGIN, -MARGIN, -MARGIN)
+        thumb = QRect(inner.left(), inner.top() + (inner.height() - THUMB_HEIGHT) // 2,
+                      THUMB_WIDTH, THUMB_HEIGHT)
+        button = QRect(inner.right() - BUTTON_WIDTH + 1, inner.top() + (inner.height() - BUTTON_HEIGHT) // 2,
+                       BUTTON_WIDTH, BUTTON_HEIGHT)
+        text = QRect(thumb.right() + SPACING, inner.top(),
+                     button.left() - thumb.right() - 2 * SPACING, inner.height())
+        return thumb, text, button
+
+    def paint(self, painter, option, index):
+        row = index.data(RowRole)
+        if row is None:
+            return
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        thumb_rect, text_rect, button_rect = self._layout(option.rect)
+
+        painter.save()
+        # Thumbnail
+        pixmap = self.thumbnails.get(row.thumb_key) if row.thumb_key else None
+        if pixmap is None and row.thumb_key:
+            self.thumbnail_missing.emit(row)
+        if pixmap is None:
+            if self._placeholder is None:
+                self._placeholder = style.standardPixmap(QStyle.StandardPixmap.SP_FileIcon).scaled(
+                    THUMB_WIDTH, THUMB_HEIGHT)
+            pixmap = self._placeholder
+        target = QRect(0, 0, pixmap.width(), pixmap.height())
+        target.moveCenter(thumb_rect.center())
+        painter.drawPixmap(target, pixmap)
+
+        # Title + status
+        metrics = QFontMetrics(option.font)
+        line = metrics.height()
+        title_rect = QRect(text_rect.left(), text_rect.top(), text_rect.width(), line)
+        status_rect = QRect(text_rect.left(), title_rect.bottom() + 2, text_rect.width(), line)
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         metrics.elidedText(row.title or row.url, Qt.TextElideMode.ElideRight, title_rect.width()))
+        painter.drawText(status_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         metrics.elidedText(str(row.status), Qt.TextElideMode.ElideRight, status_rect.width()))
+        painter.restore()
+
+        # Progress
+        bar = QStyleOptionProgressBar()
+        bar.rect = QRect(text_rect.left(), text_rect.bottom() - PROGRESS_HEIGHT + 1,
+                         text_rect.width(), PROGRESS_HEIGHT)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = int(row.progress)
+        bar.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Horizontal
+        bar.palette = option.palette
+        style.drawControl(QStyle.ControlElement.CE_ProgressBar, bar, painter, option.widget)
+
+        # Button
+        button = QStyleOptionButton()
+        button.rect = button_rect
+        button.text = "Stop" if row.active else "Resume" if row.paused else "Download"
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        button.palette = option.palette
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            _, _, button_rect = self._layout(option.rect)
+            if button_rect.contains(event.position().toPoint()):
+                self.button_clicked.emit(index.data(RowRole))
+                return True
+        return super().editorEvent(event, model, option, index)
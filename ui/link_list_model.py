@@ -0,0 +1,104 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+RowRole = Qt.ItemDataRole.UserRole + 1
+
+
+class LinkRow:
+    """
+    Everything the list knows about one link; painted by LinkItemDelegate.
+    """
+    __slots__ = ('url', 'title', 'status', 'progress', 'thumb_key', 'info',
+                 'worker', 'job', 'metadata_pending', 'paused', 'session_id', 'fmt', 'outdir', 'digest')
+
+    def __init__(self, url, title=None):
+        self.url = url
+        self.title = title
+        self.status = 'Waiting'
+        self.progress = 0.0
+        self.thumb_key = None
+        self.info = None
+        self.worker = None
+        self.job = None
+        self.metadata_pending = False
+        self.paused = False
+        self.session_id = None
+        # Format and folder of the last download, reused when resuming it
+        self.fmt = None
+        self.outdir = None
+        # "sha256:<hex>" of the finished file
+        self.digest = None
+
+    @property
+    def active(self):
+        return self.job is not None and self.job.state in (self.job.QUEUED, self.job.RUNNING, self.job.HANDED_OFF)
+
+
+class LinkListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._positions = {}
+        self._positions_valid = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == RowRole:
+            return row
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.title or row.url
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f'{row.url}\n{row.digest}' if row.digest else row.url
+        return None
+
+    def row_at(self, position):
+        return self._rows[position]
+
+    def rows(self):
+        return list(self._rows)
+
+    def add_rows(self, rows):
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        for i, row in enumerate(rows, start):
+            self._rows.append(row)
+            self._positions[id(row)] = i
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        doomed = {id(row) for row in rows}
+        # Remove contiguous blocks from the bottom so earlier positions stay valid
+        positions = sorted({p for p in (self.position(row) for row in rows) if p >= 0}, reverse=True)
+        runs = []
+        for position in positions:
+            if runs and runs[-1][0] == position + 1:
+                runs[-1][0] = position
+            else:
+                runs.append([position, position])
+        for first, last in runs:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+        for key in doomed:
+            self._positions.pop(key, None)
+        self._positions_valid = False
+
+    def position(self, row):
+        if not self._positions_valid:
+            self._positions = {id(r): i for i, r in enumerate(self._rows)}
+            self._positions_valid = True
+        return self._positions.get(id(row), -1)
+
+    def rows_changed(self, rows):
+        """
+        One dataChanged for the span covering all changed rows.
+        """
+        positions = [p for p in (self.position(row) for row in rows) if p >= 0]
+        if positions:
+            self.dataChanged.emit(self.index(min(positions)), self.index(max(positions)))
@@ -1,40 +1,96 @@
 import os
+import threading
 from pathlib import Path
 from PySide6.QtGui import QPixmap, QIcon, QFont, QDesktopServices, QPainter, QPainterPath
-from PySide6.QtCore import Qt, QUrl
+from PySide6.QtCore import Qt, QUrl, QTimer, Signal
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QDialog, QFrame, QMenuBar, QMenu,
-    QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QLabel, QComboBox, QCheckBox, QSpacerItem
+    QListView, QFileDialog, QMessageBox, QLabel, QComboBox, QCheckBox, QSpacerItem, QApplication
 )
-from PySide6.QtCore import QThreadPool
-from PySide6.QtMultimedia import QSoundEffect
 
-from core.config_manager import load_config, save_config, resource_path
-from core.metadata_fetcher import MetadataFetcher
-from ui.link_item_widget import LinkItemWidget
-import qdarktheme
-from core.downloader import download_missing_binaries
+from core.bandwidth import configure_from_config
+from core.config_manager import DebouncedWriter, SessionStore, load_config, save_config, resource_path
+from core.downloader import INFO_MAX_AGE
+from core.history import get_history, info_key
+from core.metadata_cache import RecentInfos, canonical_key, compact_info
+from core.metadata_fetcher import MetadataFetcher, PlaylistExpander
+from core.postprocess import get_postprocess_pool
+from core.progress import ProgressTable
+from core.scheduler import DownloadScheduler
+from core.signals import DownloadWorkerSignals, PlaylistSignals
+from core.stats import get_stats, stage_totals
+from core.types import DownloadTypes
+from core.worker import DownloadTask
+from ui.link_item_delegate import LinkItemDelegate
+from ui.link_list_model import LinkListModel, LinkRow
+from ui.stats_panel import StatsDialog
+from ui.thumbnails import ThumbnailCache, decode_thumbnail, scale_thumbnail
 
 
 class DownloaderWidget(QWidget):
+    # row, title, list-sized QImage, info; emitted from fetch threads
+    metadata_ready = Signal(object, object, object, object)
+    # message; emitted from the settings / session writer threads
+    persist_error = Signal(str)
+
+    # Saved queue state -> status text shown after a restart
+    RESTORED_STATUS = {'waiting': 'Waiting', 'queued': 'Paused', 'paused': 'Paused', 'done': 'Completed',
+                       'cancelled': 'Cancelled', 'failed': 'Failed'}
+
     def __init__(self):
         super().__init__()
+        self.metadata_ready.connect(self.update_row)
+        self.persist_error.connect(self.on_persist_error)
+        self.persist_errors_shown = set()
         self.cfg = load_config()
+        self.config_writer = DebouncedWriter(
+            lambda: save_config(dict(self.cfg)),
+            on_error=lambda e: self.persist_error.emit(f'Could not save settings: {e}'))
+        self.session = SessionStore(on_error=lambda e: self.persist_error.emit(f'Could not save the queue: {e}'))
         self.download_folder = self.cfg.get('last_folder', str(Path.home()))
         theme = "dark" if self.cfg.get('dark_mode', False) else "light"
-        qdarktheme.setup_theme(theme, corner_shape="rounded")
+        self.apply_theme(theme, corner_shape="rounded")
 
         self.setWindowTitle("yoo_front")
         self.setMinimumSize(800, 600)
         self.resize(1000, 700)
         self.setAcceptDrops(True)
 
-        self.threadpool = QThreadPool.globalInstance()
-        download_missing_binaries()
-
+        self.scheduler = DownloadScheduler(
+            max_concurrent=self.cfg.get('max_concurrent_downloads', 3),
+            per_host=self.cfg.get('max_downloads_per_host', 2)
+        )
+        configure_from_config(self.cfg)
+        get_postprocess_pool().set_workers(self.cfg.get('max_postprocess_workers', 0))
+        self.expanders = []
+        self.stats_dialog = None
+
+        # Workers write progress here; the UI applies it in one batch per frame
+        self.progress_table = ProgressTable()
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(100)
+        self.progress_timer.timeout.connect(self.apply_progress)
+        self.progress_timer.start()
+
+        # Coalesces visibility checks so a burst of inserts costs one layout
+        self.visible_timer = QTimer(self)
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(50)
+        self.visible_timer.timeout.connect(self.fetch_visible_metadata)
+
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(1000)
+        self.queue_timer.timeout.connect(self.update_queue_label)
+        self.queue_timer.start()
         self.setup_ui()
         self.apply_custom_styling()
 
+        # ffmpeg provisioning may take minutes and imports requests; it starts
+        # from the first paintEvent, once the window is on screen
+        self.binaries_ready = False
+        self.provisioning_started = False
+        QTimer.singleShot(0, self.restore_session)
+
     def setup_ui(self):
         # Main layout
         main_layout = QVBoxLayout(self)
@@ -51,8 +107,17 @@ class DownloaderWidget(QWidget):
         self.dark_toggle.setChecked(self.cfg.get('dark_mode', False))
         self.dark_toggle.stateChanged.connect(self.toggle_dark)
 
+        self.binaries_label = QLabel("Preparing ffmpeg...")
+        self.binaries_label.setStyleSheet("color: palette(mid);")
+
+        # Download / post-processing queue depths and post-processing timings
+        self.queue_label = QLabel()
+        self.queue_label.setStyleSheet("color: palette(mid);")
+
         header.addWidget(title)
         header.addStretch()
+        header.addWidget(self.queue_label)
+        header.addWidget(self.binaries_label)
         header.addWidget(self.dark_toggle)
 
         main_layout.addLayout(header)
@@ -73,18 +138,38 @@ class DownloaderWidget(QWidget):
         add_btn.setDefault(True)
         add_btn.clicked.connect(self.on_add_clicked)
 
+        # Shown while a playlist / channel is being expanded
+        self.stop_expand_btn = QPushButton("Stop")
+        self.stop_expand_btn.setIcon(QIcon.fromTheme("process-stop"))
+        self.stop_expand_btn.setMinimumHeight(48)
+        self.stop_expand_btn.clicked.connect(self.stop_expanding)
+        self.stop_expand_btn.hide()
+
         input_layout.addWidget(self.url_input, 1)
         input_layout.addWidget(add_btn)
+        input_layout.addWidget(self.stop_expand_btn)
         main_layout.addLayout(input_layout)
 
         # === LINK LIST ===
-        self.link_list = QListWidget()
+        self.thumbnails = ThumbnailCache()
+        self.recent_infos = RecentInfos(max_age=INFO_MAX_AGE)
+        self.link_model = LinkListModel(self)
+        self.link_delegate = LinkItemDelegate(self.thumbnails, self)
+        self.link_delegate.button_clicked.connect(self.on_row_button)
+        self.link_delegate.thumbnail_missing.connect(self.refetch_thumbnail, Qt.ConnectionType.QueuedConnection)
+        self.link_list = QListView()
+        self.link_list.setModel(self.link_model)
+        self.link_list.setItemDelegate(self.link_delegate)
+        self.link_list.setUniformItemSizes(True)
         self.link_list.setMinimumHeight(280)
         self.link_list.setAlternatingRowColors(True)
-        self.link_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.link_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
         self.link_list.setStyleSheet("""
-            QListWidget::item { padding: 8px; border-bottom: 1px solid rgba(0,0,0,0.05); }
+            QListView::item { border-bottom: 1px solid rgba(0,0,0,0.05); }
         """)
+        self.link_list.verticalScrollBar().valueChanged.connect(lambda _value: self.visible_timer.start())
+        self.link_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.link_list.customContextMenuRequested.connect(self.show_list_menu)
         main_layout.addWidget(self.link_list)
 
         # === TOOLBAR (Bottom controls) ===
@@ -102,7 +187,7 @@ class DownloaderWidget(QWidget):
         ])
         preset = self.cfg.get('format_preset', 'Best Quality (Video + Audio)')
         self.format_combo.setCurrentText(preset)
-        # self.format_combo.currentTextChanged.connect(self.on_format_changed)
+        self.format_combo.currentTextChanged.connect(self.on_format_changed)
 
         # Folder selection
         folder_btn = QPushButton("Choose")
@@ -122,6 +207,11 @@ class DownloaderWidget(QWidget):
         remove_btn.setIcon(QIcon.fromTheme("list-remove"))
         remove_btn.clicked.connect(self.remove_selected)
 
+        self.pause_btn = QPushButton("Pause Queue")
+        self.pause_btn.setIcon(QIcon.fromTheme("media-playback-pause"))
+        self.pause_btn.setCheckable(True)
+        self.pause_btn.toggled.connect(self.toggle_queue_paused)
+
         self.download_btn = QPushButton("Save All")
         self.download_btn.setIcon(QIcon.fromTheme("document-save"))
         self.download_btn.setMinimumHeight(48)
@@ -148,23 +238,31 @@ class DownloaderWidget(QWidget):
         toolbar.addWidget(open_folder_btn)
         toolbar.addStretch()
         toolbar.addWidget(remove_btn)
+        toolbar.addWidget(self.pause_btn)
         toolbar.addWidget(self.download_btn)
 
         main_layout.addLayout(toolbar)
 
-        # Sound effect for feedback
-        self.sound = QSoundEffect()
-        # self.sound.setSource(QUrl.fromLocalFile(":/sounds/add.wav"))  # optional
         self.create_menu()
 
     def create_menu(self):
         menubar = QMenuBar(self)
+        view_menu = QMenu("View", self)
+        stats_action = view_menu.addAction("Statistics")
+        stats_action.triggered.connect(self.show_stats)
+        menubar.addMenu(view_menu)
         help_menu = QMenu("Help", self)
         about_action = help_menu.addAction("About the Developer")
         about_action.triggered.connect(self.show_about_logarizm)
         menubar.addMenu(help_menu)
         self.layout().setMenuBar(menubar)
 
+    def show_stats(self):
+        if self.stats_dialog is None:
+            self.stats_dialog = StatsDialog(self.scheduler, self)
+        self.stats_dialog.show()
+        self.stats_dialog.raise_()
+
     def apply_custom_styling(self):
         # Extra polish
         self.setStyleSheet("""
@@ -197,42 +295,338 @@ class DownloaderWidget(QWidget):
         if not url:
             QMessageBox.warning(self, 'Empty', 'Please enter a valid link')
             return
-        self.add_link_item(url)
+        if PlaylistExpander.is_playlist_url(url):
+            self.expand_playlist(url)
+        else:
+            self.add_link_item(url)
         self.url_input.clear()
 
-    def add_link_item(self, url):
-        item = QListWidgetItem()
-        widget = LinkItemWidget(url)
-        item.setSizeHint(widget.sizeHint())
-        self.link_list.addItem(item)
-        self.link_list.setItemWidget(item, widget)
-        MetadataFetcher.fetch_async(
-            url, lambda title, content: self.update_widget(widget, title, content))
-
-    def update_widget(self, widget, title, content):
-        if title:
-            widget.set_title(title)
-        if content:
-            pix = QPixmap()
-            pix.loadFromData(content)
-            widget.set_thumbnail(pix)
+    def restore_session(self):
+        """
+        Rebuilds the list saved by the last run. Rows come back without
+        metadata; visible ones fetch it, from the metadata cache when possible.
+        """
+        rows = []
+        for item_id, fields in self.session.load():
+            if not fields.get('url'):
+                continue
+            row = LinkRow(fields['url'], fields.get('title'))
+            row.session_id = item_id
+            state = fields.get('state', 'waiting')
+            row.status = fields.get('status') if state == 'failed' and fields.get('status') else \
+                self.RESTORED_STATUS.get(state, 'Waiting')
+            row.progress = fields.get('progress', 0.0)
+            # Interrupted downloads resume from their partial files
+            row.paused = state in ('queued', 'paused')
+            row.fmt = fields.get('format')
+            row.outdir = fields.get('outdir')
+            row.digest = fields.get('digest')
+            row.metadata_pending = True
+            rows.append(row)
+        self.link_model.add_rows(rows)
+        if rows:
+            print(f'Restored {len(rows)} items from the last session.')
+            self.visible_timer.start()
+
+    def persist_row(self, row, **fields):
+        # A worker still finishing after its row was removed must not bring the entry back
+        if row.session_id is not None and self.link_model.position(row) >= 0:
+            self.session.put(row.session_id, **fields)
+
+    def on_persist_error(self, message):
+        print(message)
+        if message not in self.persist_errors_shown:
+            self.persist_errors_shown.add(message)
+            QMessageBox.warning(self, 'Save failed', message)
+
+    def closeEvent(self, event):
+        for writer in (self.config_writer, self.session):
+            try:
+                writer.close()
+            except OSError as e:
+                print(f'Could not save on exit: {e}')
+        super().closeEvent(event)
+
+    def add_link_item(self, url, title=None, lazy=False):
+        row = LinkRow(url, title)
+        row.session_id = self.session.add(url=url, title=title, state='waiting')
+        self.mark_if_downloaded(row)
+        self.link_model.add_rows([row])
+        # Lazy rows (playlist entries) fetch metadata once scrolled into view
+        row.metadata_pending = True
+        if not lazy:
+            self.fetch_metadata(row)
+        return row
+
+    def fetch_metadata(self, row):
+        row.metadata_pending = False
+
+        def ready(title, content, info):
+            # Runs on the fetch worker (or inline on a cache hit): decode here, not in the GUI
+            image = decode_thumbnail(content) if content else None
+            self.metadata_ready.emit(row, title, image, info)
+
+        MetadataFetcher.fetch_async(row.url, ready, thumbnail_transform=scale_thumbnail)
+
+    def refetch_thumbnail(self, row):
+        # Evicted from the memory cache; the metadata cache answers without network
+        row.thumb_key = None
+        self.fetch_metadata(row)
+
+    def fetch_visible_metadata(self):
+        viewport = self.link_list.viewport().rect()
+        first = self.link_list.indexAt(viewport.topLeft()).row()
+        if first < 0:
+            return
+        last = self.link_list.indexAt(viewport.bottomLeft()).row()
+        if last < 0:
+            last = self.link_model.rowCount() - 1
+        for position in range(first, last + 1):
+            row = self.link_model.row_at(position)
+            if row.metadata_pending:
+                self.fetch_metadata(row)
+
+    def expand_playlist(self, url):
+        signals = PlaylistSignals()
+        expander = PlaylistExpander(url, signals.entries.emit, signals.finished.emit)
+        signals.entries.connect(lambda entries: self.add_playlist_entries(expander, entries))
+        signals.finished.connect(lambda count, message: self.on_playlist_finished(expander, count, message))
+        expander.signals = signals
+        self.expanders.append(expander)
+        self.stop_expand_btn.setText("Stop")
+        self.stop_expand_btn.show()
+        expander.start()
+
+    def add_playlist_entries(self, expander, entries):
+        rows = [LinkRow(entry['url'], entry.get('title')) for entry in entries]
+        for row in rows:
+            row.metadata_pending = True
+            row.session_id = self.session.add(url=row.url, title=row.title, state='waiting')
+            self.mark_if_downloaded(row)
+        self.link_model.add_rows(rows)
+        self.stop_expand_btn.setText(f"Stop ({sum(e.count for e in self.expanders)} added)")
+        self.visible_timer.start()
+
+    def on_playlist_finished(self, expander, count, message):
+        if expander in self.expanders:
+            self.expanders.remove(expander)
+        if not self.expanders:
+            self.stop_expand_btn.hide()
+        if message and not expander.stopped:
+            QMessageBox.warning(self, 'Playlist', f'Added {count} items. {message}')
+
+    def stop_expanding(self):
+        for expander in self.expanders:
+            expander.stop()
+        self.stop_expand_btn.setText("Stopping...")
+
+    def update_row(self, row, title, image, info=None):
+        if info:
+            # Rows stay small; a full extraction is kept apart for a prompt download
+            row.info = compact_info(info)
+            if info.get('formats') and info_key(info):
+                self.recent_infos.put(info_key(info), info)
+        if title and title != row.title:
+            row.title = title
+            self.persist_row(row, title=title)
+        if info and not row.active:
+            self.mark_if_downloaded(row)
+        if image is not None:
+            key = info_key(info) or row.url
+            self.thumbnails.put(key, image)
+            row.thumb_key = key
+        self.link_model.rows_changed([row])
+
+    def apply_progress(self):
+        changed = self.progress_table.snapshot()
+        if not changed:
+            return
+        for row, (pct, status) in changed.items():
+            if pct != row.progress:
+                self.persist_row(row, progress=round(pct, 1))
+            row.progress = pct
+            if status:
+                row.status = status
+        self.link_model.rows_changed(changed.keys())
+
+    def update_queue_label(self):
+        downloads = self.scheduler.stats()
+        pool = get_postprocess_pool().stats()
+        if not (downloads['running'] or downloads['queued'] or pool['running'] or pool['queued']):
+            self.queue_label.clear()
+            return
+        self.queue_label.setText(
+            f"Downloading {downloads['running']}, {downloads['queued']} queued · "
+            f"Post-processing {pool['running']}/{pool['workers']}, {pool['queued']} waiting")
+        stages = stage_totals(get_stats().tasks())
+        self.queue_label.setToolTip('\n'.join(f"{name}: avg {s['avg']:.2f} s over {s['count']}"
+                                              for name, s in stages.items()))
+
+    def on_row_button(self, row):
+        if row.active:
+            self.stop_row(row)
+        else:
+            self.download_row(row)
+
+    def mark_if_downloaded(self, row, canonical=False):
+        """
+        Marks the row done when the history has it in the selected format.
+        With `canonical` another spelling of the same video's URL counts too;
+        matching extractors costs milliseconds per URL, so rows being added
+        in bulk rely on the extractor key their metadata brings instead.
+        """
+        history = get_history()
+        fmt = self.format_combo.currentText()
+        record = history.find_url(row.url, fmt)
+        if record is None and info_key(row.info):
+            record = history.find(info_key(row.info), fmt)
+        if record is None and canonical:
+            record = history.find(canonical_key(row.url), fmt)
+        if record:
+            row.progress = 100
+            row.status = 'Already downloaded'
+        return record
+
+    def download_row(self, row, force=False):
+        if row.active:
+            return
+        if not force and self.mark_if_downloaded(row, canonical=True):
+            self.link_model.rows_changed([row])
+            return
+        # A paused download resumes with the format and folder it started with
+        if not (row.paused and row.fmt and row.outdir):
+            row.fmt = self.format_combo.currentText()
+            row.outdir = self.download_folder
+        row.paused = False
+        self.set_row_status(row, "Queued")
+        self.persist_row(row, state='queued', format=row.fmt, outdir=row.outdir)
+        signals = DownloadWorkerSignals()
+        signals.finished.connect(lambda success, message, digest: self.on_row_finished(row, success, message, digest))
+        row.worker = DownloadTask(
+            row.url,
+            row.outdir,
+            row.fmt,
+            signals,
+            DownloadTypes.YTDLP,
+            info=self.recent_infos.pop(info_key(row.info)) or row.info,
+            progress_table=self.progress_table,
+            progress_key=row,
+            skip_existing=not force,
+            hash_downloads=self.cfg.get('hash_downloads', False)
+        )
+        row.job = self.scheduler.submit(row.worker, row.url)
+        self.link_model.rows_changed([row])
+
+    def stop_row(self, row):
+        if row.job is not None and self.scheduler.cancel(row.job):
+            self.progress_table.remove(row)
+            self.set_row_status(row, "Cancelled")
+            self.persist_row(row, state='cancelled')
+            return
+        if row.worker:
+            row.worker.stop()
+            self.set_row_status(row, "Stopping...")
+
+    def pause_row(self, row):
+        if row.job is not None and self.scheduler.cancel(row.job):
+            self.progress_table.remove(row)
+            row.paused = True
+            self.set_row_status(row, "Paused")
+            self.persist_row(row, state='paused')
+            return
+        if row.worker and row.active:
+            row.worker.pause()
+            self.set_row_status(row, "Pausing...")
+
+    def on_row_finished(self, row, success, message, digest=''):
+        # Pending table updates are older than this result
+        self.progress_table.remove(row)
+        if success:
+            row.digest = digest or None
+        if success and row.worker is not None and row.worker.job.skipped:
+            row.progress = 100
+            self.set_row_status(row, 'Already downloaded')
+            self.persist_row(row, state='done', progress=100, digest=row.digest)
+        elif success:
+            row.progress = 100
+            self.set_row_status(row, 'Completed')
+            self.persist_row(row, state='done', progress=100, digest=row.digest)
+            QApplication.beep()
+        elif message == 'Paused':
+            row.paused = True
+            self.set_row_status(row, 'Paused')
+            self.persist_row(row, state='paused')
+        elif message == 'Cancelled':
+            row.progress = 0
+            self.set_row_status(row, 'Cancelled')
+            self.persist_row(row, state='cancelled', progress=0)
+        else:
+            self.set_row_status(row, f'Failed: {message}')
+            self.persist_row(row, state='failed', status=row.status)
+
+    def set_row_status(self, row, text):
+        row.status = str(text)
+        self.link_model.rows_changed([row])
+
+    def selected_rows(self):
+        return [self.link_model.row_at(index.row()) for index in self.link_list.selectionModel().selectedRows()]
 
     def remove_selected(self):
-        for itm in self.link_list.selectedItems():
-            row = self.link_list.row(itm)
-            self.link_list.takeItem(row)
+        rows = self.selected_rows()
+        for row in rows:
+            if row.job is not None and not self.scheduler.cancel(row.job) and row.worker:
+                row.worker.stop()
+            self.progress_table.remove(row)
+            if row.session_id is not None:
+                self.session.remove(row.session_id)
+                row.session_id = None
+        self.link_model.remove_rows(rows)
+
+    def show_list_menu(self, pos):
+        index = self.link_list.indexAt(pos)
+        if not index.isValid():
+            return
+        row = self.link_model.row_at(index.row())
+        menu = QMenu(self)
+        next_action = menu.addAction("Download Next")
+        toggle_action = menu.addAction("Stop" if row.active else "Resume" if row.paused else "Download")
+        pause_action = menu.addAction("Pause") if row.active else None
+        again_action = menu.addAction("Download Again") if not row.active and row.progress >= 100 else None
+        remove_action = menu.addAction("Remove")
+        action = menu.exec(self.link_list.viewport().mapToGlobal(pos))
+        if action == next_action:
+            self.download_next(row)
+        elif action == toggle_action:
+            self.on_row_button(row)
+        elif action is not None and action == pause_action:
+            self.pause_row(row)
+        elif action is not None and action == again_action:
+            self.download_row(row, force=True)
+        elif action == remove_action:
+            self.remove_selected()
+
+    def download_next(self, row):
+        if row.job is None or row.job.state != row.job.QUEUED:
+            self.download_row(row)
+        if row.job is not None:
+            self.scheduler.move_to_front(row.job)
+
+    def toggle_queue_paused(self, paused):
+        if paused:
+            self.scheduler.pause()
+            self.pause_btn.setText("Resume Queue")
+        else:
+            if self.binaries_ready:
+                self.scheduler.resume()
+            self.pause_btn.setText("Pause Queue")
 
     def download_all(self):
-        count = self.link_list.count()
+        count = self.link_model.rowCount()
         if count == 0:
             QMessageBox.information(self, 'No Links', 'Add links before downloading.')
             return
-        fmt = self.format_combo.currentText()
-        # iterate items
-        for i in range(self.link_list.count()):
-            item = self.link_list.item(i)
-            widget = self.link_list.itemWidget(item)
-            widget.download()
+        for row in self.link_model.rows():
+            self.download_row(row)
         print(f'Started downloading {count} items.')
 
     def choose_folder(self):
@@ -242,7 +636,7 @@ class DownloaderWidget(QWidget):
             self.download_folder = folder
             self.folder_label.setText(folder)
             self.cfg['last_folder'] = folder
-            save_config(self.cfg)
+            self.config_writer.schedule()
 
     def toggle_dark(self, state):
         enabled = bool(state)
@@ -251,13 +645,57 @@ class DownloaderWidget(QWidget):
             self.apply_dark_style()
         else:
             self.apply_light_style()
-        save_config(self.cfg)
+        self.config_writer.schedule()
+
+    def on_format_changed(self, text):
+        self.cfg['format_preset'] = text
+        self.config_writer.schedule()
+
+    def apply_theme(self, theme, **kwargs):
+        import qdarktheme
+
+        qdarktheme.setup_theme(theme, **kwargs)
 
     def apply_dark_style(self):
-        qdarktheme.setup_theme("dark")
+        self.apply_theme("dark")
 
     def apply_light_style(self):
-        qdarktheme.setup_theme("light")
+        self.apply_theme("light")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.provisioning_started:
+            self.provisioning_started = True
+            QTimer.singleShot(0, self.start_provisioning)
+
+    def start_provisioning(self):
+        # Queued downloads wait for ffmpeg; they start once it is in place
+        self.scheduler.pause()
+        signals = DownloadWorkerSignals()
+        signals.status.connect(self.binaries_label.setText)
+        signals.finished.connect(self.on_provisioning_finished)
+        self.provisioning_signals = signals
+
+        def provision():
+            from core.downloader import download_missing_binaries
+            try:
+                download_missing_binaries(status_callback=signals.status.emit)
+                signals.finished.emit(True, "ffmpeg ready", "")
+            except Exception as e:
+                signals.finished.emit(False, str(e), "")
+
+        threading.Thread(target=provision, daemon=True).start()
+
+    def on_provisioning_finished(self, success, message, digest=''):
+        self.binaries_ready = True
+        if success:
+            self.binaries_label.setText(message)
+            QTimer.singleShot(3000, self.binaries_label.hide)
+        else:
+            self.binaries_label.setText("ffmpeg unavailable")
+            self.binaries_label.setToolTip(message)
+        if not self.pause_btn.isChecked():
+            self.scheduler.resume()
 
     def show_in_explorer(self):
         if self.download_folder and os.path.exists(self.download_folder):
@@ -0,0 +1,171 @@
+import time
+from pathlib import Path
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+    QFileDialog, QMessageBox
+)
+
+from core.postprocess import get_postprocess_pool
+from core.stats import get_stats
+
+# Newest tasks shown in the table; exports always contain all of them
+DISPLAY_ROWS = 500
+
+COLUMNS = [
+    ('URL', 'url'),
+    ('Result', 'outcome'),
+    ('Queue wait', 'queue_wait_s'),
+    ('Extract', 'extract_s'),
+    ('First byte', 'ttfb_s'),
+    ('Download', 'download_s'),
+    ('Avg speed', 'sustained_bps'),
+    ('Peak speed', 'peak_bps'),
+    ('Retries', 'retries'),
+    ('PP wait', 'postprocess_wait_s'),
+    ('Post-process', 'postprocess_s'),
+]
+
+
+def format_seconds(value):
+    return '' if value is None else f'{value:.2f} s'
+
+
+def format_rate(value):
+    return '' if not value else f'{value / 1024 / 1024:.2f} MB/s'
+
+
+def format_cell(key, value):
+    if key.endswith('_bps'):
+        return format_rate(value)
+    if key.endswith('_s'):
+        return format_seconds(value)
+    return '' if value is None else str(value)
+
+
+class StatsDialog(QDialog):
+    """
+    Live view of the stats registry: where the time of each download went,
+    metadata timings and pool utilisation, refreshed once a second while
+    open, with JSON / CSV export.
+    """
+
+    def __init__(self, scheduler=None, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.setWindowTitle("Statistics")
+        self.resize(980, 560)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        self.summary_label.setTextFormat(Qt.TextFormat.RichText)
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _key in COLUMNS])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        json_btn = QPushButton("Export JSON")
+        json_btn.clicked.connect(lambda: self.export('json'))
+        csv_btn = QPushButton("Export CSV")
+        csv_btn.clicked.connect(lambda: self.export('csv'))
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        buttons.addWidget(reset_btn)
+        buttons.addStretch()
+        buttons.addWidget(json_btn)
+        buttons.addWidget(csv_btn)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snapshot = get_stats().snapshot()
+        self.summary_label.setText(self.summary_html(snapshot))
+        tasks = snapshot['tasks'][-DISPLAY_ROWS:][::-1]
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(tasks))
+        for i, task in enumerate(tasks):
+            for j, (_title, key) in enumerate(COLUMNS):
+                item = QTableWidgetItem(format_cell(key, task[key]))
+                if key == 'url':
+                    item.setToolTip(task['error'] or task['url'])
+                elif key == 'postprocess_s' and task['postprocess_stages']:
+                    item.setToolTip('\n'.join(f'{name}: {seconds:.2f} s'
+                                              for name, seconds in task['postprocess_stages'].items()))
+                self.table.setItem(i, j, item)
+        self.table.setUpdatesEnabled(True)
+
+    def summary_html(self, snapshot):
+        summary = snapshot['summary']
+        phases = summary['phases']
+        outcomes = ', '.join(f'{count} {outcome}' for outcome, count in sorted(summary['outcomes'].items()))
+        lines = [
+            f"<b>Tasks:</b> {summary['tasks']}" + (f" ({outcomes})" if outcomes else '')
+            + f" &nbsp; <b>Data:</b> {summary['bytes'] / 1024 / 1024:.1f} MB"
+            + f" &nbsp; <b>Avg speed:</b> {format_rate(summary['avg_sustained_bps']) or '-'}"
+            + f" &nbsp; <b>Peak:</b> {format_rate(summary['peak_bps']) or '-'}"
+            + f" &nbsp; <b>Retries:</b> {summary['retries']}",
+            "<b>Time spent:</b> " + ' &nbsp; '.join(
+                f"{label} {phases[key]['total']:.1f} s" for label, key in (
+                    ('queued', 'queue_wait_s'), ('extracting', 'extract_s'), ('first byte', 'ttfb_s'),
+                    ('downloading', 'download_s'), ('waiting for post-processing', 'postprocess_wait_s'),
+                    ('post-processing', 'postprocess_s'))),
+        ]
+        stages = summary['postprocess_stages']
+        if stages:
+            lines.append("<b>Post-processing:</b> " + ' &nbsp; '.join(
+                f"{name} avg {s['avg']:.2f} s ({s['count']}x)" for name, s in stages.items()))
+        metadata = snapshot['metadata']
+        if metadata['count']:
+            lines.append(f"<b>Metadata:</b> {metadata['count']} extractions, "
+                         f"avg {metadata['avg_extract_s']:.2f} s (max {metadata['max_extract_s']:.2f} s), "
+                         f"avg wait {metadata['avg_queue_wait_s']:.2f} s, {metadata['failed']} failed")
+        pools = [f"{name} {p['busy']}/{p['capacity']} busy, peak {p['peak']}, {p['utilization'] * 100:.0f}% used"
+                 for name, p in snapshot['pools'].items()]
+        if self.scheduler is not None:
+            pools.append(f"{self.scheduler.stats()['queued']} queued")
+        pools.append(f"{get_postprocess_pool().stats()['queued']} waiting for post-processing")
+        connections = snapshot['connections']
+        pools.append(f"HTTP {connections['requests']} requests on {connections['new_connections']} connections")
+        lines.append("<b>Pools:</b> " + ' &nbsp; '.join(pools))
+        return '<br>'.join(lines)
+
+    def reset(self):
+        get_stats().reset()
+        self.refresh()
+
+    def export(self, kind):
+        default = str(Path.home() / f"yoo_front-stats-{time.strftime('%Y%m%d-%H%M%S')}.{kind}")
+        path, _ = QFileDialog.getSaveFileName(self, "Export statistics", default,
+                                              "CSV (*.csv)" if kind == 'csv' else "JSON (*.json)")
+        if not path:
+            return
+        if not path.lower().endswith(f'.{kind}'):
+            path += f'.{kind}'
+        try:
+            get_stats().export(path)
+        except OSError as e:
+            QMessageBox.warning(self, 'Export failed', str(e))
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QImage, QPixmap
+
+THUMB_WIDTH = 96
+THUMB_HEIGHT = 54
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def scale_thumbnail(content):
+    """
+    Decodes full-size thumbnail bytes and re-encodes them at list size.
+    Safe to call off the GUI thread (QImage only); runs in the fetch worker so
+    the full-resolution image never reaches the UI or the metadata cache.
+    """
+    image = QImage.fromData(content)
+    if image.isNull():
+        return content
+    if image.width() <= THUMB_WIDTH and image.height() <= THUMB_HEIGHT:
+        return content
+    image = image.scaled(THUMB_WIDTH, THUMB_HEIGHT, Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if not image.save(buffer, "JPG", 90):
+        return content
+    return bytes(data)
+
+
+def decode_thumbnail(content):
+    """
+    Bytes -> QImage no larger than the list thumbnail, off the GUI thread.
+    """
+    image = QImage.fromData(content)
+    if image.isNull():
+        return None
+    if image.width() > THUMB_WIDTH or image.height() > THUMB_HEIGHT:
+        image = image.scaled(THUMB_WIDTH, THUMB_HEIGHT, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+class ThumbnailCache:
+    """
+    Memory-capped LRU of list-sized pixmaps keyed by video ID.
+    Lives on the GUI thread; rows only keep the key.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key, image: QImage):
+        if key in self._items:
+            self.size -= self._cost(self._items.pop(key))
+        pixmap = QPixmap.fromImage(image)
+        self._items[key] = pixmap
+        self.size += self._cost(pixmap)
+        while self.size > self.max_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= self._cost(evicted)
+        return pixmap
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    @staticmethod
+    def _cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)